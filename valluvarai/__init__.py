@@ -2,6 +2,8 @@
 ValluvarAI - An AI-powered storytelling & literary companion for Tamil ethics, emotions, and culture.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from valluvarai.agents.kural_matcher import KuralMatcher
 from valluvarai.agents.story_generator import StoryGenerator
 from valluvarai.agents.image_prompt_builder import ImagePromptBuilder
@@ -38,15 +40,40 @@ class KuralAgent:
         # Find relevant Kural
         kural_id, kural_text, kural_translation = self.kural_matcher.find_kural(keyword)
 
-        # Generate story
-        tamil_story, english_story = self.story_generator.generate_story(
+        # The subtasks are mostly waiting on external APIs, so independent ones run side by side
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return self._tell_story(
+                executor, kural_id, kural_text, kural_translation,
+                include_images, include_video, language
+            )
+
+    def _tell_story(self, executor, kural_id, kural_text, kural_translation,
+                    include_images, include_video, language):
+        """Generate the content for a matched Kural, overlapping independent subtasks."""
+        # Generate story and literary analysis
+        story_future = executor.submit(
+            self.story_generator.generate_story,
             kural_id, kural_text, kural_translation, language
         )
+        analysis_future = executor.submit(
+            self.insight_engine.analyze, kural_id, kural_text, kural_translation
+        )
+        tamil_story, english_story = story_future.result()
 
-        # Generate literary analysis
-        analysis_result = self.insight_engine.analyze(kural_id, kural_text, kural_translation)
+        # Generate images and audio narration; both only need the stories
+        images_future = None
+        if include_images:
+            images_future = executor.submit(
+                self._generate_images, tamil_story, english_story, kural_text, kural_translation
+            )
+        audio_futures = {}
+        if tamil_story:
+            audio_futures["tamil"] = executor.submit(self.narration_engine.generate_audio, tamil_story, "tamil")
+        if english_story:
+            audio_futures["english"] = executor.submit(self.narration_engine.generate_audio, english_story, "english")
 
         # Extract the analysis from the result
+        analysis_result = analysis_future.result()
         analysis = analysis_result.get("analysis", {
             "historical_context": "Analysis not available. Please check your API configuration.",
             "linguistic_analysis": "Analysis not available. Please check your API configuration.",
@@ -67,18 +94,10 @@ class KuralAgent:
             "video": None
         }
 
-        # Generate images if requested
-        if include_images:
-            image_prompts = self.image_prompt_builder.build_prompts(
-                tamil_story, english_story, kural_text, kural_translation
-            )
-            result["images"] = self.image_generator.generate_images(image_prompts)
-
-        # Generate audio narration
-        if tamil_story:
-            result["audio"]["tamil"] = self.narration_engine.generate_audio(tamil_story, "tamil")
-        if english_story:
-            result["audio"]["english"] = self.narration_engine.generate_audio(english_story, "english")
+        if images_future:
+            result["images"] = images_future.result()
+        for lang, future in audio_futures.items():
+            result["audio"][lang] = future.result()
 
         # Generate video if requested
         if include_video and include_images:
@@ -91,4 +110,11 @@ class KuralAgent:
 
         return result
 
+    def _generate_images(self, tamil_story, english_story, kural_text, kural_translation):
+        """Build image prompts from the stories and generate the images."""
+        image_prompts = self.image_prompt_builder.build_prompts(
+            tamil_story, english_story, kural_text, kural_translation
+        )
+        return self.image_generator.generate_images(image_prompts)
+
 __version__ = "0.1.0"
@@ -8,7 +8,7 @@ from typing import List, Optional, Dict, Any, Tuple, Union
 import json
 
 from valluvarai.config import config
-from valluvarai.utils.cache import cache
+from valluvarai.utils.cache import get_cache
 
 try:
     import openai
@@ -129,7 +129,7 @@ class ImagePromptBuilder:
             "time_period": time_period,
             "custom_elements": custom_elements
         }
-        cached_prompts = cache.get("image_prompts", cache_key)
+        cached_prompts = get_cache().get("image_prompts", cache_key)
         if cached_prompts:
             return cached_prompts
 
@@ -156,7 +156,7 @@ class ImagePromptBuilder:
             prompts = self._generate_rule_based(story, kural_translation, num_images, style_desc, period_desc, custom_desc)
 
         # Cache the results
-        cache.set("image_prompts", cache_key, prompts)
+        get_cache().set("image_prompts", cache_key, prompts)
 
         return prompts
 
@@ -5,7 +5,7 @@ Narration Engine - Generates audio narration for stories.
 import os
 import tempfile
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, BinaryIO, Callable
 
 try:
     import requests
@@ -15,6 +15,8 @@ try:
 except ImportError:
     TTS_AVAILABLE = False
 
+from valluvarai.utils.cache import get_cache
+
 class NarrationEngine:
     """
     Generates audio narration for stories using text-to-speech technology.
@@ -55,6 +57,13 @@ class NarrationEngine:
         Returns:
             Dictionary with audio file information.
         """
+        # Reuse narration generated earlier for the same text
+        cache_key = {"text": text, "language": language, "provider": self.tts_provider}
+        cached = get_cache().get_artifact("audio", cache_key)
+        if cached:
+            file_path, meta = cached
+            return {**meta, "file_path": file_path, "cached": True}
+        
         if not TTS_AVAILABLE:
             return {
                 "success": False,
@@ -63,12 +72,19 @@ class NarrationEngine:
             }
         
         if self.tts_provider == "gtts":
-            return self._generate_with_gtts(text, language)
+            result = self._generate_with_gtts(text, language)
         elif self.tts_provider == "elevenlabs" and self.api_key:
-            return self._generate_with_elevenlabs(text, language)
+            result = self._generate_with_elevenlabs(text, language)
         else:
             # Fall back to gTTS if the specified provider is not available
-            return self._generate_with_gtts(text, language)
+            result = self._generate_with_gtts(text, language)
+        
+        # Link the audio file into the cache rather than storing a second copy
+        if result.get("success") and result.get("file_path"):
+            meta = {k: v for k, v in result.items() if k != "file_path"}
+            get_cache().set_artifact("audio", cache_key, result["file_path"], meta)
+        
+        return result
     
     def _generate_with_gtts(self, text: str, language: str) -> Dict[str, Any]:
         """
@@ -91,7 +107,7 @@ class NarrationEngine:
             
             # Generate the audio
             tts = gTTS(text=text, lang=lang_code, slow=False)
-            tts.save(str(file_path))
+            self._replace_file(file_path, tts.write_to_fp)
             
             return {
                 "success": True,
@@ -151,8 +167,7 @@ class NarrationEngine:
             
             if response.status_code == 200:
                 # Save the audio file
-                with open(file_path, "wb") as f:
-                    f.write(response.content)
+                self._replace_file(file_path, lambda f: f.write(response.content))
                 
                 return {
                     "success": True,
@@ -168,6 +183,27 @@ class NarrationEngine:
             # Fall back to gTTS
             return self._generate_with_gtts(text, language)
     
+    def _replace_file(self, file_path: Path, write: Callable[[BinaryIO], Any]):
+        """
+        Write a file through a temporary file and move it into place.
+        
+        Filenames can repeat across runs, and the cache hard-links finished
+        files, so a fresh file is swapped in rather than overwriting the old
+        one (and any cached link to it) in place.
+        
+        Args:
+            file_path: Path of the file to write.
+            write: Callable that writes the contents to a binary file object.
+        """
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=file_path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
     def _estimate_duration(self, text: str, language: str) -> float:
         """
         Estimate the duration of the audio in seconds.
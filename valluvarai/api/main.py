@@ -238,7 +238,7 @@ async def generate_story(request: StoryRequest):
             image_prompts = kural_agent.image_prompt_builder.build_prompts(
                 tamil_story, english_story, kural_text, kural_translation
             )
-            result["images"] = kural_agent.image_generator.generate_images(image_prompts)
+            result["images"] = await kural_agent.image_generator.generate_images_async(image_prompts)
 
         return result
     except Exception as e:
@@ -267,7 +267,7 @@ async def generate_images(request: ImageRequest):
         )
 
         # Generate images
-        images = kural_agent.image_generator.generate_images(image_prompts)
+        images = await kural_agent.image_generator.generate_images_async(image_prompts)
 
         return {
             "kural_id": request.kural_id,
@@ -304,7 +304,7 @@ async def generate_video(request: VideoRequest):
         )
 
         # Generate images
-        images = kural_agent.image_generator.generate_images(image_prompts)
+        images = await kural_agent.image_generator.generate_images_async(image_prompts)
 
         # Generate audio if requested
         audio = {}
@@ -315,7 +315,7 @@ async def generate_video(request: VideoRequest):
                 audio["english"] = kural_agent.narration_engine.generate_audio(english_story, "english")
 
         # Generate video
-        video = kural_agent.video_builder.create_video(
+        video = await kural_agent.video_builder.create_video_async(
             images,
             audio,
             tamil_story if "tamil" in request.language else None,
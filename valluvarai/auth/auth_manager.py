@@ -18,9 +18,14 @@ except ImportError:
     print("Authentication libraries not available. Please install them with:")
     print("pip install python-jose[cryptography] passlib[bcrypt] pydantic[email]")
 
+from pydantic import TypeAdapter
+
 from valluvarai.auth.models import User, UserInDB, UserCreate, UserUpdate, Token, TokenData, UserPreferences
 from valluvarai.config import config
 
+# Validates all stored users in a single pydantic-core call
+_USER_LIST_ADAPTER = TypeAdapter(List[UserInDB])
+
 
 class AuthManager:
     """Authentication manager for ValluvarAI."""
@@ -78,19 +83,11 @@ class AuthManager:
             with open(self.users_file, "r", encoding="utf-8") as f:
                 users_data = json.load(f)
                 
-                # Convert JSON data to UserInDB objects
-                users = {}
-                for username, user_data in users_data.items():
-                    # Convert datetime strings to datetime objects
-                    if "created_at" in user_data and isinstance(user_data["created_at"], str):
-                        user_data["created_at"] = datetime.fromisoformat(user_data["created_at"])
-                    if "last_login" in user_data and isinstance(user_data["last_login"], str) and user_data["last_login"]:
-                        user_data["last_login"] = datetime.fromisoformat(user_data["last_login"])
-                    
-                    # Create UserInDB object
-                    users[username] = UserInDB(**user_data)
+                # Convert JSON data to UserInDB objects in one batch;
+                # pydantic parses the ISO datetime strings itself
+                users = _USER_LIST_ADAPTER.validate_python(list(users_data.values()))
                 
-                return users
+                return dict(zip(users_data.keys(), users))
         except Exception as e:
             print(f"Error loading users: {e}")
             return {}
@@ -98,17 +95,10 @@ class AuthManager:
     def _save_users(self):
         """Save users to file."""
         try:
-            # Convert UserInDB objects to dictionaries
-            users_data = {}
-            for username, user in self.users.items():
-                # Convert to dictionary and handle datetime objects
-                user_dict = user.dict()
-                if isinstance(user_dict["created_at"], datetime):
-                    user_dict["created_at"] = user_dict["created_at"].isoformat()
-                if isinstance(user_dict["last_login"], datetime):
-                    user_dict["last_login"] = user_dict["last_login"].isoformat()
-                
-                users_data[username] = user_dict
+            # Convert UserInDB objects to dictionaries in one batch; JSON mode
+            # renders the datetime fields as ISO strings inside pydantic-core
+            users_list = _USER_LIST_ADAPTER.dump_python(list(self.users.values()), mode="json")
+            users_data = dict(zip(self.users.keys(), users_list))
             
             with open(self.users_file, "w", encoding="utf-8") as f:
                 json.dump(users_data, f, indent=2)
@@ -318,7 +308,6 @@ class AuthManager:
             email=user_create.email,
             full_name=user_create.full_name,
             hashed_password=hashed_password,
-            created_at=datetime.now(),
             preferences=UserPreferences(),
             usage_stats={"searches": 0, "stories_generated": 0, "images_generated": 0, "videos_generated": 0}
         )
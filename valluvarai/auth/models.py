@@ -2,9 +2,10 @@
 Authentication models for ValluvarAI.
 """
 
+import sys
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, field_validator
 
 
 class UserPreferences(BaseModel):
@@ -16,14 +17,18 @@ class UserPreferences(BaseModel):
     enable_image_generation: bool = True
     enable_video_generation: bool = False
     enable_audio_generation: bool = True
-    favorite_kurals: List[int] = []
-    favorite_themes: List[str] = []
+    favorite_kurals: List[int] = Field(default_factory=list)
+    favorite_themes: List[str] = Field(default_factory=list)
     ui_theme: str = "light"
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    @field_validator("favorite_themes")
+    @classmethod
+    def _intern_themes(cls, themes: List[str]) -> List[str]:
+        """Intern theme names, which come from a small shared vocabulary."""
+        return [sys.intern(theme) for theme in themes]
+    
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "default_language": "both",
                 "default_image_style": "photorealistic",
@@ -36,6 +41,7 @@ class UserPreferences(BaseModel):
                 "ui_theme": "light"
             }
         }
+    )
 
 
 class User(BaseModel):
@@ -52,10 +58,8 @@ class User(BaseModel):
     preferences: UserPreferences = Field(default_factory=UserPreferences)
     usage_stats: Dict[str, Any] = Field(default_factory=dict)
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "user123",
                 "username": "valluvar_fan",
@@ -84,6 +88,7 @@ class User(BaseModel):
                 }
             }
         }
+    )
 
 
 class Token(BaseModel):
@@ -93,16 +98,16 @@ class Token(BaseModel):
     token_type: str
     expires_at: datetime
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
                 "token_type": "bearer",
                 "expires_at": "2023-01-02T00:00:00"
             }
         }
+    )
 
 
 class TokenData(BaseModel):
@@ -111,15 +116,15 @@ class TokenData(BaseModel):
     username: str
     exp: datetime
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "username": "valluvar_fan",
                 "exp": "2023-01-02T00:00:00"
             }
         }
+    )
 
 
 class UserCreate(BaseModel):
@@ -130,10 +135,9 @@ class UserCreate(BaseModel):
     password: str
     full_name: Optional[str] = None
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "username": "valluvar_fan",
                 "email": "user@example.com",
@@ -141,6 +145,7 @@ class UserCreate(BaseModel):
                 "full_name": "Tamil Literature Enthusiast"
             }
         }
+    )
 
 
 class UserUpdate(BaseModel):
@@ -151,10 +156,9 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
     preferences: Optional[UserPreferences] = None
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        defer_build=True,
+        json_schema_extra={
             "example": {
                 "email": "newemail@example.com",
                 "full_name": "Updated Name",
@@ -165,6 +169,7 @@ class UserUpdate(BaseModel):
                 }
             }
         }
+    )
 
 
 class UserInDB(User):
@@ -172,10 +177,8 @@ class UserInDB(User):
     
     hashed_password: str
     
-    class Config:
-        """Pydantic config."""
-        
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "user123",
                 "username": "valluvar_fan",
@@ -205,3 +208,4 @@ class UserInDB(User):
                 }
             }
         }
+    )
@@ -5,9 +5,20 @@ Handles API keys, service settings, and fallback mechanisms.
 
 import os
 import json
+import copy
+import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    # json.loads accepts bytes as well
+    _loads = json.loads
+
+_log = logging.getLogger(__name__)
+
 # Default configuration
 DEFAULT_CONFIG = {
     "api_keys": {
@@ -57,6 +68,10 @@ DEFAULT_CONFIG = {
     }
 }
 
+# Defaults with the computed cache directory filled in
+_DEFAULTS = copy.deepcopy(DEFAULT_CONFIG)
+_DEFAULTS["cache"]["cache_dir"] = str(Path.home() / ".valluvarai" / "cache")
+
 class Config:
     """Configuration manager for ValluvarAI."""
     
@@ -67,11 +82,12 @@ class Config:
         Args:
             config_path: Path to the configuration file. If None, uses the default path.
         """
-        self.config = DEFAULT_CONFIG.copy()
+        # Deep copy, so nested sections aren't shared with other instances
+        self.config = copy.deepcopy(_DEFAULTS)
         
-        # Set default cache directory
-        if not self.config["cache"]["cache_dir"]:
-            self.config["cache"]["cache_dir"] = str(Path.home() / ".valluvarai" / "cache")
+        # Pending-write state for batched updates (see __enter__/__exit__)
+        self._dirty = False
+        self._batching = 0
         
         # Load configuration from file if available
         if config_path:
@@ -86,14 +102,26 @@ class Config:
     
     def _load_config(self):
         """Load configuration from file."""
-        if self.config_path.exists():
-            try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    file_config = json.load(f)
-                    # Update config with file values, preserving default values for missing keys
-                    self._update_nested_dict(self.config, file_config)
-            except Exception as e:
-                print(f"Error loading configuration: {e}")
+        # Parse the raw bytes directly: one read, no intermediate str decode
+        try:
+            data = self.config_path.read_bytes()
+        except FileNotFoundError:
+            return
+        except OSError:
+            _log.exception("Error loading configuration")
+            return
+        
+        try:
+            file_config = _loads(data)
+        except ValueError as e:
+            _log.warning("Invalid configuration JSON in %s: %s", self.config_path, e)
+            return
+        
+        try:
+            # Update config with file values, preserving default values for missing keys
+            self._update_nested_dict(self.config, file_config)
+        except Exception:
+            _log.exception("Error loading configuration")
     
     def _update_nested_dict(self, d: Dict, u: Dict):
         """
@@ -123,16 +151,44 @@ class Config:
             if env_var in os.environ:
                 self.config["api_keys"][key] = os.environ[env_var]
     
+    def __enter__(self):
+        """
+        Start a batch of updates; the file is written once when the batch ends.
+        
+        Example:
+            with config:
+                config.set_api_key("openai", key)
+                config.set_service_config("image_generation", settings)
+        """
+        self._batching += 1
+        return self
+    
+    def __exit__(self, *exc_info):
+        """End a batch of updates and write any pending changes."""
+        self._batching -= 1
+        if self._batching == 0 and self._dirty:
+            self._flush()
+    
     def save(self):
-        """Save the configuration to file."""
+        """Save the configuration to file, deferring the write while batching."""
+        self._dirty = True
+        if self._batching == 0:
+            self._flush()
+    
+    def _flush(self):
+        """Atomically write the configuration to file."""
         try:
             # Create directory if it doesn't exist
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2)
-        except Exception as e:
-            print(f"Error saving configuration: {e}")
+            # Write to a temporary file and rename it over the target so a
+            # crash mid-write never leaves a truncated config behind
+            tmp_path = self.config_path.with_suffix(self.config_path.suffix + ".tmp")
+            tmp_path.write_text(json.dumps(self.config, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.config_path)
+            self._dirty = False
+        except Exception:
+            _log.exception("Error saving configuration")
     
     def get_api_key(self, service: str) -> str:
         """
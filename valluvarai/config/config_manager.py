@@ -4,10 +4,13 @@ Configuration manager for ValluvarAI.
 
 import os
 import json
+import logging
 import dotenv
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+_log = logging.getLogger(__name__)
+
 # Load environment variables from .env file
 dotenv.load_dotenv()
 
@@ -58,10 +61,10 @@ class ConfigManager:
                     with open(default_config_path, "r", encoding="utf-8") as f:
                         return json.load(f)
                 else:
-                    print(f"Warning: Default config file not found at {default_config_path}")
+                    _log.warning("Default config file not found at %s", default_config_path)
                     return {}
-        except Exception as e:
-            print(f"Error loading configuration: {e}")
+        except Exception:
+            _log.exception("Error loading configuration")
             return {}
 
     def save_config(self):
@@ -72,8 +75,8 @@ class ConfigManager:
 
             with open(self.config_file, "w", encoding="utf-8") as f:
                 json.dump(self.config, f, indent=2)
-        except Exception as e:
-            print(f"Error saving configuration: {e}")
+        except Exception:
+            _log.exception("Error saving configuration")
 
     def get_api_key(self, provider: str) -> Optional[str]:
         """
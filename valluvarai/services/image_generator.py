@@ -3,22 +3,42 @@ Image Generator - Generates images based on prompts using AI services.
 """
 
 import os
+import json
+import queue
+import asyncio
 import tempfile
+import textwrap
 import time
-import base64
+import hashlib
+import shutil
+import sqlite3
+import threading
+import functools
+import itertools
+import zlib
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable
 import random
 
 try:
     import requests
-    from PIL import Image
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from PIL import Image, ImageChops, ImageDraw, ImageFont
     import numpy as np
     from io import BytesIO
     IMAGE_LIBS_AVAILABLE = True
 except ImportError:
     IMAGE_LIBS_AVAILABLE = False
 
+try:
+    # SIMD-accelerated base64, noticeably faster on multi-megabyte payloads
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
 try:
     import openai
     from openai import OpenAI
@@ -26,6 +46,144 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
+# sentence-transformers pulls in torch, so only check that it is installed
+# here and import it when the semantic prompt cache is first used
+EMBEDDINGS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+
+@functools.lru_cache(maxsize=2)
+def _get_embedder(model_name: str):
+    """Load (once per process) the sentence embedding model used for prompt matching."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+@functools.lru_cache(maxsize=16)
+def _get_font(name: str, size: int):
+    """Load a TrueType font once per (name, size), falling back to PIL's default font."""
+    try:
+        return ImageFont.truetype(name, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=8)
+def _gradient_ramps(width: int, height: int):
+    """
+    Build the 8-bit ramps used for placeholder backgrounds.
+
+    The ramps are cached per size and shared between calls, so callers must
+    derive new images from them rather than drawing on them.
+
+    Args:
+        width: Image width in pixels.
+        height: Image height in pixels.
+
+    Returns:
+        Tuple of (vertical, horizontal, diagonal) "L" mode ramps, each going
+        from 0 at the start edge to 255 at the far edge.
+    """
+    vertical = Image.linear_gradient("L").resize((width, height))
+    horizontal = Image.linear_gradient("L").transpose(Image.ROTATE_90).resize((width, height))
+    diagonal = ImageChops.add(vertical, horizontal, scale=2.0)
+    return vertical, horizontal, diagonal
+
+
+# Shared output directory for generators created without an explicit one
+_DEFAULT_TMPDIR: Optional[Path] = None
+_DEFAULT_TMPDIR_LOCK = threading.Lock()
+
+# Placeholder PNGs are encoded and written by a single background thread so
+# that callers don't wait on disk; ImageGenerator.flush() waits for them
+_writer_queue: "queue.Queue" = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread: Optional[threading.Thread] = None
+
+# Unfinished writes by file path, so each caller waits only for its own images
+_pending_writes: Dict[str, Future] = {}
+
+
+def _writer_loop():
+    """Save queued images until the process exits."""
+    while True:
+        image, file_path, save_options, future = _writer_queue.get()
+        try:
+            image.save(file_path, **save_options)
+        except Exception as e:
+            print(f"Error saving placeholder image: {e}")
+        finally:
+            with _writer_lock:
+                if _pending_writes.get(str(file_path)) is future:
+                    del _pending_writes[str(file_path)]
+            future.set_result(None)
+
+
+def _save_in_background(image: "Image.Image", file_path: Path, **save_options) -> Future:
+    """Queue an image to be saved by the background writer thread."""
+    global _writer_thread
+    future = Future()
+    with _writer_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(target=_writer_loop, name="valluvarai-image-writer", daemon=True)
+            _writer_thread.start()
+        _pending_writes[str(file_path)] = future
+    _writer_queue.put((image, file_path, save_options, future))
+    return future
+
+
+class _RateLimiter:
+    """
+    Thread-safe token bucket that spaces out provider requests.
+    """
+
+    def __init__(self, rate: Optional[float], burst: int = 1):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Number of requests allowed per second. None or a value of
+                zero or less disables the limit.
+            burst: Number of requests that may start back-to-back.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be issued."""
+        if not self.rate or self.rate <= 0:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Reserve a token; a negative balance is the wait owed to the bucket
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+
+# One limiter per provider, so every generator in the process shares its rate limit
+_rate_limiters: Dict[str, _RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def _get_rate_limiter(provider: str, rate: Optional[float]) -> _RateLimiter:
+    """Get the shared rate limiter of a provider, applying the latest configured rate."""
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(provider)
+        if limiter is None:
+            limiter = _rate_limiters[provider] = _RateLimiter(rate=rate)
+        else:
+            limiter.rate = rate
+        return limiter
+
+
 class ImageGenerator:
     """
     Generates images based on prompts using AI services like DALL-E or Stable Diffusion.
@@ -59,6 +217,14 @@ class ImageGenerator:
             self.image_size = image_size or image_gen_config.get("image_size", "1024x1024")
             self.model = model or image_gen_config.get("model", "dall-e-3")
             self.fallback_to_placeholder = image_gen_config.get("fallback_to_placeholder", True)
+            self.concurrency = image_gen_config.get("concurrency", 4)
+            self.semantic_cache = image_gen_config.get("semantic_cache", False)
+            self.semantic_cache_model = image_gen_config.get("semantic_cache_model", "sentence-transformers/all-MiniLM-L6-v2")
+            self.semantic_cache_threshold = image_gen_config.get("semantic_cache_threshold", 0.92)
+            self.semantic_cache_size = image_gen_config.get("semantic_cache_size", 512)
+            self.requests_per_second = image_gen_config.get("rate_limits", {}).get(self.provider, 2.0)
+            self.return_bytes = image_gen_config.get("return_bytes", False)
+            self.manifest = image_gen_config.get("manifest", False)
         except ImportError:
             # If config is not available, use default values
             self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
@@ -66,16 +232,62 @@ class ImageGenerator:
             self.image_size = image_size or "1024x1024"
             self.model = model or "dall-e-3"
             self.fallback_to_placeholder = True
+            self.concurrency = 4
+            self.semantic_cache = False
+            self.semantic_cache_model = "sentence-transformers/all-MiniLM-L6-v2"
+            self.semantic_cache_threshold = 0.92
+            self.semantic_cache_size = 512
+            self.requests_per_second = 2.0
+            self.return_bytes = False
+            self.manifest = False
 
         self.client = None
 
+        # Paces provider requests to the provider's configured rate limit
+        self._rate_limiter = _get_rate_limiter(self.provider, self.requests_per_second)
+
+        # Reuse pooled keep-alive connections across provider calls and polls
+        self.http = None
+        if IMAGE_LIBS_AVAILABLE:
+            self.http = requests.Session()
+            self.http.mount("https://", HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+            ))
+
         # Set up output directory
         if output_dir:
-            self.output_dir = Path(output_dir)
+            self.output_dir = Path(output_dir).resolve()
             os.makedirs(self.output_dir, exist_ok=True)
         else:
-            self.output_dir = Path(tempfile.mkdtemp())
-            os.makedirs(self.output_dir, exist_ok=True)
+            global _DEFAULT_TMPDIR
+            # Generators built concurrently must not each create (and leak) a directory
+            with _DEFAULT_TMPDIR_LOCK:
+                if _DEFAULT_TMPDIR is None:
+                    _DEFAULT_TMPDIR = Path(tempfile.mkdtemp(prefix="valluvarai_img_"))
+            self.output_dir = _DEFAULT_TMPDIR
+
+        # Image filenames share a per-instance timestamp and a running counter
+        self._fname_prefix = int(time.time())
+        self._counter = itertools.count()
+
+        # Semantic prompt cache: unit-norm prompt embeddings (one row per
+        # entry) alongside the generated image records and their hit counts
+        self.semantic_cache = self.semantic_cache and EMBEDDINGS_AVAILABLE and IMAGE_LIBS_AVAILABLE
+        self._semantic_lock = threading.Lock()
+        self._prompt_vectors = None
+        self._prompt_records: List[Dict[str, Any]] = []
+        self._prompt_hits: List[int] = []
+        self._semantic_dirty = False
+        if self.semantic_cache:
+            self._load_semantic_cache()
+
+        # SQLite manifest of generated images, for exact-prompt reuse
+        self._db = None
+        self._db_lock = threading.Lock()
+        if self.manifest:
+            self._open_manifest()
 
         # Initialize the client if possible
         if OPENAI_AVAILABLE and self.api_key and self.provider == "openai":
@@ -90,6 +302,43 @@ class ImageGenerator:
         """
         Generate images based on the provided prompts.
 
+        Args:
+            prompts: List of text prompts for image generation.
+
+        Returns:
+            List of dictionaries with image information.
+        """
+        results = self._generate_all(prompts)
+
+        # Placeholders are saved in the background; make sure they exist
+        # before their paths are handed back
+        self.flush(results)
+
+        return results
+
+    def flush(self, results: Optional[List[Dict[str, Any]]] = None):
+        """
+        Wait until queued placeholder images have been written to disk.
+
+        Args:
+            results: Only wait for the images in these results. If None, waits
+                for every image queued so far.
+        """
+        with _writer_lock:
+            if results is None:
+                futures = list(_pending_writes.values())
+            else:
+                futures = [
+                    _pending_writes[result["file_path"]]
+                    for result in results
+                    if result and result.get("file_path") in _pending_writes
+                ]
+        wait(futures)
+
+    def _generate_all(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate images for all prompts, concurrently where possible.
+
         Args:
             prompts: List of text prompts for image generation.
 
@@ -110,34 +359,406 @@ class ImageGenerator:
                 results.append(self._generate_placeholder(prompt, i, error="No OpenAI API key provided"))
             return results
 
+        # Issue the provider requests concurrently; they are network-bound
+        generator = self._resolve_provider()
+        groups = self._group_prompts(prompts)
+        results = [None] * len(prompts)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(groups)))) as executor:
+            futures = {
+                executor.submit(self._dispatch_group, generator, prompt, indices, len(prompts)): indices
+                for prompt, indices in groups
+            }
+            for future in as_completed(futures):
+                for index, result in zip(futures[future], future.result()):
+                    results[index] = result
+
+        if self._semantic_dirty:
+            self._save_semantic_cache()
+
+        return results
+
+    async def generate_images_async(self, prompts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate images without blocking the running event loop.
+
+        Provider calls run in executor threads, with at most `concurrency`
+        of them in flight at once.
+
+        Args:
+            prompts: List of text prompts for image generation.
+
+        Returns:
+            List of dictionaries with image information.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Empty or key-less requests only produce placeholders
+        if not prompts or (self.provider == "openai" and not self.api_key):
+            return await loop.run_in_executor(None, self.generate_images, prompts)
+
+        generator = self._resolve_provider()
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def generate_group(prompt: str, indices: List[int]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await loop.run_in_executor(None, self._dispatch_group, generator, prompt, indices, len(prompts))
+
+        groups = self._group_prompts(prompts)
+        group_results = await asyncio.gather(*(generate_group(prompt, indices) for prompt, indices in groups))
+
+        results = [None] * len(prompts)
+        for (_, indices), batch in zip(groups, group_results):
+            for index, result in zip(indices, batch):
+                results[index] = result
+
+        if self._semantic_dirty:
+            await loop.run_in_executor(None, self._save_semantic_cache)
+
+        await loop.run_in_executor(None, self.flush, results)
+
+        return list(results)
+
+    def _resolve_provider(self) -> Optional[Callable[[str, int], Dict[str, Any]]]:
+        """
+        Pick the generation method for the configured provider.
+
+        Returns:
+            Bound provider method, or None if the provider is not available.
+        """
+        if self.provider == "openai" and OPENAI_AVAILABLE and self.client:
+            return self._generate_with_openai
+        if self.provider == "stability" and self.api_key:
+            return self._generate_with_stability
+        if self.provider == "leonardo" and self.api_key:
+            return self._generate_with_leonardo
+        return None
+
+    def _group_prompts(self, prompts: List[str]) -> List[Tuple[str, List[int]]]:
+        """
+        Group prompts into units of work for the provider.
+
+        DALL-E 2 can return several images for one prompt in a single
+        request, so repeated prompts are grouped together for it. Every other
+        provider gets one group per prompt.
+
+        Args:
+            prompts: List of text prompts for image generation.
+
+        Returns:
+            List of (prompt, indices) tuples covering every prompt index.
+        """
+        if not (self.provider == "openai" and self.model == "dall-e-2" and OPENAI_AVAILABLE and self.client):
+            return [(prompt, [i]) for i, prompt in enumerate(prompts)]
+
+        groups: Dict[str, List[int]] = {}
         for i, prompt in enumerate(prompts):
-            try:
-                print(f"Generating image {i+1}/{len(prompts)} with provider: {self.provider}")
+            groups.setdefault(prompt, []).append(i)
+        return list(groups.items())
+
+    def _dispatch_group(
+        self,
+        generator: Optional[Callable[[str, int], Dict[str, Any]]],
+        prompt: str,
+        indices: List[int],
+        total: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate one image for each index in a group of identical prompts.
 
-                if self.provider == "openai" and OPENAI_AVAILABLE and self.client:
-                    result = self._generate_with_openai(prompt, i)
-                elif self.provider == "stability" and self.api_key:
-                    result = self._generate_with_stability(prompt, i)
-                elif self.provider == "leonardo" and self.api_key:
-                    result = self._generate_with_leonardo(prompt, i)
-                else:
-                    # Fall back to placeholder images if no provider is available
-                    error_msg = f"Provider '{self.provider}' not available or not configured properly."
-                    print(error_msg)
-                    result = self._generate_placeholder(prompt, i, error=error_msg)
+        Args:
+            generator: Provider method from `_resolve_provider`, or None.
+            prompt: The text prompt for image generation.
+            indices: Indices of the prompt in the list.
+            total: Total number of prompts being generated.
 
-                results.append(result)
+        Returns:
+            List of dictionaries with image information, one per index.
+        """
+        if len(indices) == 1:
+            return [self._dispatch(generator, prompt, indices[0], total)]
 
-                # Add a small delay to avoid rate limiting
-                time.sleep(0.5)
+        try:
+            print(f"Generating {len(indices)} images for prompt {indices[0]+1}/{total} in one request")
+
+            # Reuse the variations generated for this prompt before, in order
+            results = []
+            if self._db is not None:
+                for variation in range(len(indices)):
+                    cached = self._manifest_lookup(prompt, variation)
+                    if not cached:
+                        break
+                    results.append(cached)
+                if results:
+                    print(f"Reusing {len(results)} generated image(s) for prompt {indices[0]}")
+                    if len(results) == len(indices):
+                        return results
+
+            vector = None
+            if self.semantic_cache and not results:
+                vector = self._embed_prompt(prompt)
+                cached = self._semantic_lookup(vector)
+                if cached:
+                    # A near-identical prompt's image only stands in for the first
+                    # variation; the caller still gets distinct images for the rest
+                    print(f"Reusing cached image for prompt {indices[0]}")
+                    results.append({**cached, "prompt": prompt, "cached": True})
+
+            self._rate_limiter.acquire()
+            generated = self._generate_batch_with_openai(prompt, indices[len(results):])
+
+            for variation, result in enumerate(generated, start=len(results)):
+                if result.get("success") and result.get("file_path") and self._db is not None:
+                    self._manifest_record(prompt, result, variation)
+            if vector is not None and not results and generated[0].get("success") and generated[0].get("file_path"):
+                self._semantic_insert(vector, generated[0])
+            return results + generated
 
-            except Exception as e:
-                error_msg = f"Error generating image for prompt {i}: {e}"
+        except Exception as e:
+            error_msg = f"Error generating images for prompt {indices[0]}: {e}"
+            print(error_msg)
+            return [self._generate_placeholder(prompt, i, error=error_msg) for i in indices]
+
+    def _dispatch(
+        self,
+        generator: Optional[Callable[[str, int], Dict[str, Any]]],
+        prompt: str,
+        index: int,
+        total: int
+    ) -> Dict[str, Any]:
+        """
+        Generate a single image with the configured provider.
+
+        Args:
+            generator: Provider method from `_resolve_provider`, or None.
+            prompt: The text prompt for image generation.
+            index: Index of the prompt in the list.
+            total: Total number of prompts being generated.
+
+        Returns:
+            Dictionary with image information.
+        """
+        try:
+            print(f"Generating image {index+1}/{total} with provider: {self.provider}")
+
+            if generator:
+                # Reuse an earlier image for the same prompt
+                if self._db is not None:
+                    cached = self._manifest_lookup(prompt)
+                    if cached:
+                        print(f"Reusing generated image for prompt {index}")
+                        return cached
+
+                # ... or for a near-identical one
+                vector = None
+                if self.semantic_cache:
+                    vector = self._embed_prompt(prompt)
+                    cached = self._semantic_lookup(vector)
+                    if cached:
+                        print(f"Reusing cached image for prompt {index}")
+                        return {**cached, "prompt": prompt, "cached": True}
+
+                self._rate_limiter.acquire()
+                result = generator(prompt, index)
+
+                if result.get("success") and result.get("file_path"):
+                    if self._db is not None:
+                        self._manifest_record(prompt, result)
+                    if vector is not None:
+                        self._semantic_insert(vector, result)
+                return result
+            else:
+                # Fall back to placeholder images if no provider is available
+                error_msg = f"Provider '{self.provider}' not available or not configured properly."
                 print(error_msg)
-                # Add a placeholder image on error
-                results.append(self._generate_placeholder(prompt, i, error=error_msg))
+                return self._generate_placeholder(prompt, index, error=error_msg)
 
-        return results
+        except Exception as e:
+            error_msg = f"Error generating image for prompt {index}: {e}"
+            print(error_msg)
+            # Add a placeholder image on error
+            return self._generate_placeholder(prompt, index, error=error_msg)
+
+    def _open_manifest(self):
+        """Open (creating if needed) the image manifest in the output directory."""
+        try:
+            self._db = sqlite3.connect(
+                str(self.output_dir / "manifest.db"),
+                isolation_level=None,
+                check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS images "
+                "(hash TEXT PRIMARY KEY, path TEXT, provider TEXT, created REAL)"
+            )
+        except sqlite3.Error as e:
+            print(f"Error opening image manifest: {e}")
+            self._db = None
+
+    def _manifest_key(self, prompt: str, variation: int = 0) -> str:
+        """
+        Build the manifest key for a prompt.
+
+        Args:
+            prompt: The text prompt for image generation.
+            variation: Which of several images for the same prompt this is.
+
+        Returns:
+            Hex digest of the prompt and the settings that affect the image.
+        """
+        key = f"{self.provider}\0{self.model}\0{self.image_size}\0{prompt}"
+        if variation:
+            # The first variation keeps the key single-image lookups use
+            key += f"\0{variation}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _manifest_lookup(self, prompt: str, variation: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previously generated image for exactly this prompt.
+
+        Args:
+            prompt: The text prompt for image generation.
+            variation: Which of several images for the same prompt to look up.
+
+        Returns:
+            Dictionary with image information, or None on a miss.
+        """
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT path, provider FROM images WHERE hash = ?",
+                    (self._manifest_key(prompt, variation),)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading image manifest: {e}")
+            return None
+
+        if not row or not os.path.exists(row[0]):
+            return None
+
+        return {
+            "success": True,
+            "file_path": row[0],
+            "url": None,
+            "prompt": prompt,
+            "provider": row[1],
+            "cached": True
+        }
+
+    def _manifest_record(self, prompt: str, result: Dict[str, Any], variation: int = 0):
+        """
+        Record a generated image in the manifest.
+
+        Args:
+            prompt: The text prompt for image generation.
+            result: Dictionary with image information.
+            variation: Which of several images for the same prompt this is.
+        """
+        try:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO images (hash, path, provider, created) VALUES (?, ?, ?, ?)",
+                    (self._manifest_key(prompt, variation), result["file_path"], result["provider"], time.time())
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing image manifest: {e}")
+
+    def _embed_prompt(self, prompt: str) -> "np.ndarray":
+        """
+        Embed a prompt for the semantic cache.
+
+        Args:
+            prompt: The text prompt for image generation.
+
+        Returns:
+            Unit-norm embedding vector.
+        """
+        vector = _get_embedder(self.semantic_cache_model).encode(prompt, normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def _semantic_lookup(self, vector: "np.ndarray") -> Optional[Dict[str, Any]]:
+        """
+        Find a previously generated image whose prompt is similar enough.
+
+        Args:
+            vector: Unit-norm embedding of the prompt.
+
+        Returns:
+            Copy of the cached image record, or None on a miss.
+        """
+        with self._semantic_lock:
+            if self._prompt_vectors is None:
+                return None
+
+            # Cosine similarity, since all vectors are unit-norm
+            similarities = self._prompt_vectors @ vector
+            best = int(similarities.argmax())
+            if similarities[best] < self.semantic_cache_threshold:
+                return None
+
+            record = self._prompt_records[best]
+            if not record.get("file_path") or not os.path.exists(record["file_path"]):
+                return None
+
+            self._prompt_hits[best] += 1
+            self._semantic_dirty = True
+            return dict(record)
+
+    def _semantic_insert(self, vector: "np.ndarray", record: Dict[str, Any]):
+        """
+        Add a generated image to the semantic cache.
+
+        Args:
+            vector: Unit-norm embedding of the prompt.
+            record: Dictionary with image information.
+        """
+        with self._semantic_lock:
+            if self._prompt_vectors is None:
+                self._prompt_vectors = vector[None, :]
+            else:
+                # Evict the least commonly used entry when full
+                if len(self._prompt_records) >= self.semantic_cache_size:
+                    victim = int(np.argmin(self._prompt_hits))
+                    self._prompt_vectors = np.delete(self._prompt_vectors, victim, axis=0)
+                    del self._prompt_records[victim]
+                    del self._prompt_hits[victim]
+                self._prompt_vectors = np.vstack([self._prompt_vectors, vector])
+
+            self._prompt_records.append(dict(record))
+            self._prompt_hits.append(0)
+            self._semantic_dirty = True
+
+    def _load_semantic_cache(self):
+        """Load the semantic cache persisted in the output directory, if any."""
+        vectors_path = self.output_dir / "prompt_cache.npy"
+        records_path = self.output_dir / "prompt_cache.json"
+        if not vectors_path.exists() or not records_path.exists():
+            return
+
+        try:
+            vectors = np.load(vectors_path)
+            with open(records_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if len(vectors) == len(data["records"]) == len(data["hits"]) and len(vectors):
+                self._prompt_vectors = vectors
+                self._prompt_records = data["records"]
+                self._prompt_hits = data["hits"]
+        except Exception as e:
+            print(f"Error loading semantic prompt cache: {e}")
+
+    def _save_semantic_cache(self):
+        """Persist the semantic cache to the output directory."""
+        with self._semantic_lock:
+            if self._prompt_vectors is None:
+                return
+
+            try:
+                np.save(self.output_dir / "prompt_cache.npy", self._prompt_vectors)
+                with open(self.output_dir / "prompt_cache.json", "w", encoding="utf-8") as f:
+                    json.dump({"records": self._prompt_records, "hits": self._prompt_hits}, f)
+                self._semantic_dirty = False
+            except Exception as e:
+                print(f"Error saving semantic prompt cache: {e}")
 
     def _generate_with_openai(self, prompt: str, index: int) -> Dict[str, Any]:
         """
@@ -161,30 +782,61 @@ class ImageGenerator:
 
             image_url = response.data[0].url
 
-            # Download the image
-            image_response = requests.get(image_url)
-            if image_response.status_code == 200:
-                # Save the image
-                filename = f"image_{index}_{int(time.time())}.png"
-                file_path = self.output_dir / filename
+            return {
+                "success": True,
+                **self._store_image(image_url=image_url),
+                "url": image_url,
+                "prompt": prompt,
+                "provider": "openai"
+            }
+
+        except Exception as e:
+            error_msg = f"Error with OpenAI image generation: {e}"
+            print(error_msg)
+            return self._generate_placeholder(prompt, index, error=error_msg)
+
+    def _generate_batch_with_openai(self, prompt: str, indices: List[int]) -> List[Dict[str, Any]]:
+        """
+        Generate several images for one prompt using DALL-E 2's `n` parameter.
 
-                with open(file_path, "wb") as f:
-                    f.write(image_response.content)
+        Args:
+            prompt: The text prompt for image generation.
+            indices: Indices of the prompt in the list, one per image.
 
-                return {
-                    "success": True,
-                    "file_path": str(file_path),
-                    "url": image_url,
-                    "prompt": prompt,
-                    "provider": "openai"
-                }
-            else:
-                raise Exception(f"Failed to download image: {image_response.status_code}")
+        Returns:
+            List of dictionaries with image information, one per index.
+        """
+        results = []
+        error_msg = "OpenAI returned fewer images than requested"
+        try:
+            # DALL-E 2 returns at most 10 images per request
+            for start in range(0, len(indices), 10):
+                chunk = indices[start:start + 10]
+                response = self.client.images.generate(
+                    model=self.model,
+                    prompt=prompt,
+                    size=self.image_size,
+                    n=len(chunk),
+                )
+
+                for index, image in zip(chunk, response.data):
+                    results.append({
+                        "success": True,
+                        **self._store_image(image_url=image.url),
+                        "url": image.url,
+                        "prompt": prompt,
+                        "provider": "openai"
+                    })
 
         except Exception as e:
             error_msg = f"Error with OpenAI image generation: {e}"
             print(error_msg)
-            return self._generate_placeholder(prompt, index, error=error_msg)
+
+        # Anything the provider didn't return falls back to a placeholder
+        for index in indices[len(results):]:
+            results.append(self._generate_placeholder(prompt, index, error=error_msg))
+
+        return results
 
     def _generate_with_stability(self, prompt: str, index: int) -> Dict[str, Any]:
         """
@@ -220,7 +872,7 @@ class ImageGenerator:
                 "steps": 30
             }
 
-            response = requests.post(url, headers=headers, json=body)
+            response = self.http.post(url, headers=headers, json=body)
 
             if response.status_code == 200:
                 data = response.json()
@@ -228,16 +880,9 @@ class ImageGenerator:
                 # Get the image data
                 image_data = data["artifacts"][0]["base64"]
 
-                # Save the image
-                filename = f"image_{index}_{int(time.time())}.png"
-                file_path = self.output_dir / filename
-
-                with open(file_path, "wb") as f:
-                    f.write(base64.b64decode(image_data))
-
                 return {
                     "success": True,
-                    "file_path": str(file_path),
+                    **self._store_image(image_data=_b64.b64decode(image_data, validate=False)),
                     "url": None,  # No URL for Stability AI
                     "prompt": prompt,
                     "provider": "stability"
@@ -284,18 +929,21 @@ class ImageGenerator:
                 "promptMagic": True
             }
 
-            generation_response = requests.post(generation_url, json=generation_payload, headers=headers)
+            generation_response = self.http.post(generation_url, json=generation_payload, headers=headers)
 
             if generation_response.status_code == 200:
                 generation_data = generation_response.json()
                 generation_id = generation_data["sdGenerationJob"]["generationId"]
 
-                # Poll for generation completion
-                max_attempts = 30
-                for attempt in range(max_attempts):
+                # Poll for generation completion within a wall-clock budget,
+                # backing off between checks
+                status_url = f"https://cloud.leonardo.ai/api/rest/v1/generations/{generation_id}"
+                status_headers = dict(headers)
+                deadline = time.monotonic() + 60
+                delay = 0.5
+                while time.monotonic() < deadline:
                     # Check generation status
-                    status_url = f"https://cloud.leonardo.ai/api/rest/v1/generations/{generation_id}"
-                    status_response = requests.get(status_url, headers=headers)
+                    status_response = self.http.get(status_url, headers=status_headers)
 
                     if status_response.status_code == 200:
                         status_data = status_response.json()
@@ -305,31 +953,25 @@ class ImageGenerator:
                             # Get the image URL
                             image_url = status_data["generations_by_pk"]["generated_images"][0]["url"]
 
-                            # Download the image
-                            image_response = requests.get(image_url)
-                            if image_response.status_code == 200:
-                                # Save the image
-                                filename = f"image_{index}_{int(time.time())}.png"
-                                file_path = self.output_dir / filename
-
-                                with open(file_path, "wb") as f:
-                                    f.write(image_response.content)
-
-                                return {
-                                    "success": True,
-                                    "file_path": str(file_path),
-                                    "url": image_url,
-                                    "prompt": prompt,
-                                    "provider": "leonardo"
-                                }
-                            else:
-                                raise Exception(f"Failed to download image: {image_response.status_code}")
-
-                        # If not complete, wait and try again
-                        time.sleep(2)
-                    else:
+                            return {
+                                "success": True,
+                                **self._store_image(image_url=image_url),
+                                "url": image_url,
+                                "prompt": prompt,
+                                "provider": "leonardo"
+                            }
+
+                        # Let the server answer 304 while the status is unchanged
+                        etag = status_response.headers.get("ETag")
+                        if etag:
+                            status_headers["If-None-Match"] = etag
+                    elif status_response.status_code != 304:
                         raise Exception(f"Leonardo AI API error: {status_response.status_code} - {status_response.text}")
 
+                    # If not complete, wait (with jitter) and try again
+                    time.sleep(delay + random.uniform(0, 0.25))
+                    delay = min(delay * 1.5, 4.0)
+
                 # If we've reached here, generation timed out
                 raise Exception("Leonardo AI generation timed out")
             else:
@@ -340,6 +982,52 @@ class ImageGenerator:
             print(error_msg)
             return self._generate_placeholder(prompt, index, error=error_msg)
 
+    def _store_image(self, image_url: Optional[str] = None, image_data: Optional[bytes] = None) -> Dict[str, Any]:
+        """
+        Save a generated image, or keep it in memory when `return_bytes` is set.
+
+        Args:
+            image_url: URL to download the image from.
+            image_data: Image bytes already returned by the provider.
+
+        Returns:
+            Dictionary with the image's "file_path", plus its "bytes" when
+            returning images in memory.
+        """
+        if self.return_bytes:
+            if image_data is None:
+                image_response = self.http.get(image_url)
+                if image_response.status_code != 200:
+                    raise Exception(f"Failed to download image: {image_response.status_code}")
+                image_data = image_response.content
+            return {"file_path": None, "bytes": image_data}
+
+        filename = f"image_{self._fname_prefix}_{next(self._counter)}.png"
+        file_path = self.output_dir / filename
+        if image_data is None:
+            self._download_image(image_url, file_path)
+        else:
+            with open(file_path, "wb") as f:
+                f.write(image_data)
+        return {"file_path": str(file_path)}
+
+    def _download_image(self, image_url: str, file_path: Path):
+        """
+        Stream an image from a URL straight to disk.
+
+        Args:
+            image_url: URL of the generated image.
+            file_path: Path to save the image to.
+        """
+        with self.http.get(image_url, stream=True) as image_response:
+            if image_response.status_code != 200:
+                raise Exception(f"Failed to download image: {image_response.status_code}")
+
+            # Copy in fixed-size chunks instead of buffering the whole body
+            image_response.raw.decode_content = True
+            with open(file_path, "wb", buffering=1 << 20) as f:
+                shutil.copyfileobj(image_response.raw, f, length=1 << 16)
+
     def _generate_placeholder(self, prompt: str, index: int, error: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate a placeholder image when no provider is available or on error.
@@ -367,71 +1055,71 @@ class ImageGenerator:
             }
 
         try:
+            # Name the file after its content so identical placeholders are
+            # only rendered once
+            content_key = f"{prompt}\0{error or ''}".encode("utf-8")
+            filename = f"placeholder_{hashlib.blake2b(content_key, digest_size=8).hexdigest()}.png"
+            file_path = self.output_dir / filename
+            result = {
+                "success": False,
+                "file_path": str(file_path),
+                "url": None,
+                "prompt": prompt,
+                "provider": "placeholder",
+                "error": error or "No image provider available or error occurred"
+            }
+            if file_path.exists():
+                return result
+
             # Create a simple colored image with text
             width, height = 512, 512
 
-            # Generate a random color based on the hash of the prompt
-            prompt_hash = hash(prompt)
+            # Generate a color from a stable hash of the prompt
+            prompt_hash = zlib.crc32(prompt.encode("utf-8"))
             r = (prompt_hash & 0xFF0000) >> 16
             g = (prompt_hash & 0x00FF00) >> 8
             b = prompt_hash & 0x0000FF
 
-            # Create a gradient background
-            array = np.zeros((height, width, 3), dtype=np.uint8)
-            for y in range(height):
-                for x in range(width):
-                    array[y, x, 0] = int(r * (1 - y/height) + (255 - r) * (y/height))
-                    array[y, x, 1] = int(g * (1 - x/width) + (255 - g) * (x/width))
-                    array[y, x, 2] = int(b * (1 - (x+y)/(width+height)) + (255 - b) * ((x+y)/(width+height)))
+            # Create a gradient background (red varies by row, green by
+            # column, blue along the diagonal) by mapping each 8-bit ramp
+            # from the prompt color to its complement
+            channels = []
+            for ramp, start in zip(_gradient_ramps(width, height), (r, g, b)):
+                lut = [start + ((255 - 2 * start) * v) // 255 for v in range(256)]
+                channels.append(ramp.point(lut))
 
             # Create the image
-            image = Image.fromarray(array)
-
-            # Save the image
-            filename = f"placeholder_{index}_{int(time.time())}.png"
-            file_path = self.output_dir / filename
-            image.save(file_path)
+            image = Image.merge("RGB", channels)
 
             # If we have an error message, try to add it to the image
-            if error and hasattr(image, "text"):
+            if error:
                 try:
-                    from PIL import ImageDraw, ImageFont
                     draw = ImageDraw.Draw(image)
-                    # Use a default font
                     font_size = 20
-                    try:
-                        font = ImageFont.truetype("Arial", font_size)
-                    except:
-                        font = ImageFont.load_default()
-
-                    # Wrap text to fit in the image
-                    lines = []
-                    words = error.split()
-                    current_line = words[0]
-                    for word in words[1:]:
-                        if len(current_line + " " + word) * font_size < width - 40:
-                            current_line += " " + word
-                        else:
-                            lines.append(current_line)
-                            current_line = word
-                    lines.append(current_line)
+                    font = _get_font("Arial", font_size)
+
+                    # Wrap text to fit in the image, measuring with the font itself
+                    avg_char_width = max(1, int(font.getlength("M")))
+                    max_chars = max(1, (width - 40) // avg_char_width)
+                    lines = textwrap.wrap(error, width=max_chars)
 
                     # Draw text
-                    y = height // 2 - (len(lines) * font_size) // 2
-                    for line in lines:
-                        draw.text((width // 2, y), line, fill=(255, 255, 255), font=font, anchor="mm")
-                        y += font_size + 5
+                    draw.multiline_text(
+                        (width // 2, height // 2),
+                        "\n".join(lines),
+                        fill=(255, 255, 255),
+                        font=font,
+                        anchor="mm",
+                        align="center",
+                    )
                 except Exception as e:
                     print(f"Error adding text to placeholder image: {e}")
 
-            return {
-                "success": False,
-                "file_path": str(file_path),
-                "url": None,
-                "prompt": prompt,
-                "provider": "placeholder",
-                "error": error or "No image provider available or error occurred"
-            }
+            # Save the image
+            # Placeholders are throwaway, so favour encode speed over size
+            _save_in_background(image, file_path, format="PNG", optimize=False, compress_level=1)
+
+            return result
 
         except Exception as e:
             print(f"Error generating placeholder image: {e}")
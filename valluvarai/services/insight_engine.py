@@ -3,16 +3,274 @@ Insight Engine - Provides literary analysis of Thirukkural verses.
 """
 
 import json
+import logging
 import os
+import re
+import asyncio
+import random
+import textwrap
+import threading
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Mapping, Iterator, Tuple
 
 try:
-    import openai
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
+    import orjson
+    _loads = orjson.loads
 except ImportError:
-    OPENAI_AVAILABLE = False
+    _loads = json.loads
+
+# openai is slow to import, so only check that it is installed here and
+# import it when a client is first needed
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
+
+from valluvarai.utils.cache import get_cache
+
+_log = logging.getLogger(__name__)
+
+# OpenAI clients shared by every engine using the same API key, so their
+# connection pools (and warm TLS connections) are reused across engines
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+
+# Bump whenever the analysis prompts change, so cached analyses are not reused
+_PROMPT_VERSION = 3
+
+# Longest explanation (in characters) included in the prompt; the model only
+# needs the gist, and prompt tokens dominate request latency and cost
+_EXPLANATION_WIDTH = 400
+
+_SYSTEM_PROMPT = """You are a Tamil literature expert specializing in Thirukkural analysis.
+Provide a comprehensive analysis of the given Thirukkural verse in the following format:
+
+1. Historical Context: Explain when this concept was important in Tamil culture and history
+2. Linguistic Analysis: Analyze the poetic devices, word choices, and structure
+3. Philosophical Depth: Explain the philosophical underpinnings and ethical principles
+4. Contemporary Relevance: How this Kural applies to modern life and current issues
+5. Emotional Resonance: The emotional impact and psychological insights of this Kural
+
+Keep each section concise (2-3 sentences) but insightful."""
+
+_USER_TEMPLATE = """Thirukkural Details:
+- ID: {id}
+- Section: {section}
+- Chapter: {chapter} ({chapter_english})
+- Tamil Text: {tamil}
+- English Translation: {english}
+- Tamil Explanation: {explanation_tamil}
+- English Explanation: {explanation_english}
+
+Please provide a comprehensive analysis of this Thirukkural verse.""".format
+
+# With share_chapter_context enabled, the chapter-level sections are asked for
+# once per chapter and only the verse-specific ones per Kural
+_CHAPTER_SYSTEM_PROMPT = """You are a Tamil literature expert specializing in Thirukkural analysis.
+Describe the given Thirukkural chapter in the following format:
+
+1. Historical Context: Explain when this concept was important in Tamil culture and history
+2. Philosophical Depth: Explain the philosophical underpinnings and ethical principles
+
+Keep each section concise (2-3 sentences) but insightful."""
+
+_CHAPTER_USER_TEMPLATE = """Thirukkural Chapter:
+- Section: {section}
+- Chapter: {chapter} ({chapter_english})
+
+Please describe the historical context and philosophical depth of this chapter.""".format
+
+_KURAL_SYSTEM_PROMPT = """You are a Tamil literature expert specializing in Thirukkural analysis.
+Provide an analysis of the given Thirukkural verse in the following format:
+
+1. Linguistic Analysis: Analyze the poetic devices, word choices, and structure
+2. Contemporary Relevance: How this Kural applies to modern life and current issues
+3. Emotional Resonance: The emotional impact and psychological insights of this Kural
+
+Keep each section concise (2-3 sentences) but insightful."""
+
+# Numbered section headers in the model's analysis, e.g. "2. Linguistic Analysis:"
+_SECTION_RE = re.compile(
+    r"^\s*\d+\.\s*(Historical Context|Linguistic Analysis|Philosophical Depth|"
+    r"Contemporary Relevance|Emotional Resonance):",
+    re.MULTILINE
+)
+_SECTION_KEYS = {
+    "Historical Context": "historical_context",
+    "Linguistic Analysis": "linguistic_analysis",
+    "Philosophical Depth": "philosophical_depth",
+    "Contemporary Relevance": "contemporary_relevance",
+    "Emotional Resonance": "emotional_resonance"
+}
+
+# Number of Kurals in the Thirukkural; valid IDs are 1 to _KURAL_COUNT
+_KURAL_COUNT = 1330
+
+_KURAL_DATA_PATH = Path(__file__).parent.parent / "kural_data" / "kural_1330.json"
+
+# Kurals indexed by ID, loaded from the dataset on first use
+_KURAL_INDEX: Optional[Dict[int, Dict[str, Any]]] = None
+_KURAL_INDEX_LOCK = threading.Lock()
+
+# Details used for a Kural that is not in the dataset
+_DEFAULT_KURAL = MappingProxyType({
+    "section": "Unknown",
+    "section_english": "Unknown",
+    "chapter": "Unknown",
+    "chapter_english": "Unknown",
+    "tamil": "",
+    "english": "",
+    "explanation_tamil": "",
+    "explanation_english": ""
+})
+
+# Fields every indexed Kural is guaranteed to have, blank if the dataset lacks them
+_REQUIRED_KEYS = tuple(_DEFAULT_KURAL)
+
+
+# Canned analyses for the template fallback, by topic
+_TEMPLATE_ANALYSES: Dict[str, Mapping[str, str]] = {
+    "forgiveness": MappingProxyType({
+        "historical_context": "Forgiveness was a cornerstone virtue in ancient Tamil society, especially during the Sangam period (300 BCE to 300 CE) when conflicts between kingdoms were common. Thiruvalluvar emphasized forgiveness as a path to peace in an era of frequent warfare.",
+        "linguistic_analysis": "This Kural uses contrasting imagery of strength and weakness, employing a paradox to convey that true power lies in restraint rather than retaliation. The Tamil word 'பொறை' (porai) carries deeper connotations than the English 'forgiveness,' suggesting both patience and emotional fortitude.",
+        "philosophical_depth": "The verse reflects the influence of both Jain and Buddhist philosophies on Tamil ethics, particularly the concept of ahimsa (non-violence). It presents forgiveness not as passive submission but as an active choice requiring greater inner strength than revenge.",
+        "contemporary_relevance": "In today's conflict-ridden world, this Kural offers wisdom for both personal relationships and international diplomacy. The principle that true strength lies in forgiveness rather than retaliation remains revolutionary in contexts from social media disputes to geopolitical tensions.",
+        "emotional_resonance": "The Kural speaks to the universal human struggle between the immediate emotional satisfaction of revenge and the deeper peace that comes from letting go. It acknowledges the difficulty of forgiveness while affirming its ultimate reward of inner freedom."
+    }),
+    "love": MappingProxyType({
+        "historical_context": "The concept of selfless love was central to Tamil culture during the Sangam period, influencing both personal relationships and community structures. Thiruvalluvar's teachings on love emerged during a time when Tamil society was developing sophisticated ethical frameworks for human connections.",
+        "linguistic_analysis": "This Kural employs powerful contrasting imagery between the self-centered and the loving person. The Tamil original uses the word 'எலும்பு' (elumbu/bone) metaphorically to suggest that even one's most fundamental physical structure belongs to others when one truly loves.",
+        "philosophical_depth": "The verse reflects the Tamil philosophical concept of 'அன்பு' (anbu), which transcends Western notions of love to encompass a universal compassion and selflessness. It suggests that true identity is found not in self-preservation but in giving oneself to others.",
+        "contemporary_relevance": "In an age of increasing individualism and self-focus, this Kural challenges modern assumptions about personal boundaries and self-care. It offers a radical alternative to consumer culture by suggesting that fulfillment comes through giving rather than acquiring.",
+        "emotional_resonance": "The Kural touches on the paradoxical human experience that our greatest joy often comes when we forget ourselves in service to others. It validates the emotional truth that love expands rather than diminishes our sense of self."
+    }),
+    "learning": MappingProxyType({
+        "historical_context": "Education was highly valued in ancient Tamil society, with centers of learning established throughout the Tamil region during the Sangam period. Thiruvalluvar emphasized the practical application of knowledge at a time when formal education was becoming more structured.",
+        "linguistic_analysis": "This Kural employs a concise, imperative structure that emphasizes both the acquisition and application of knowledge. The repetition of 'கற்க' (karka/learn) creates a rhythmic emphasis that underscores the importance of thorough learning.",
+        "philosophical_depth": "The verse reflects the pragmatic orientation of Tamil ethics, which valued knowledge not for its own sake but for its transformative potential. It suggests a holistic view of education that encompasses both intellectual understanding and moral character.",
+        "contemporary_relevance": "In today's information-saturated world, this Kural reminds us that true education goes beyond accumulating facts to living in accordance with what we've learned. It speaks to current educational debates about the purpose of learning and the gap between knowledge and wisdom.",
+        "emotional_resonance": "The Kural addresses the universal human tendency to separate knowing from doing, challenging us to integrate our understanding into our character. It suggests that the emotional satisfaction of learning comes not from what we know but from how we live."
+    })
+}
+
+# Chapter keywords mapped to their canned analysis, in order of precedence
+_TOPIC_KEYWORDS = {
+    "forgiveness": "forgiveness",
+    "patience": "forgiveness",
+    "love": "love",
+    "learning": "learning",
+    "education": "learning"
+}
+
+# Analysis for chapters without a canned one; the historical context is
+# filled in with the chapter name
+_GENERIC_ANALYSIS = MappingProxyType({
+    "linguistic_analysis": "The verse demonstrates Thiruvalluvar's characteristic economy of language, conveying profound meaning in just seven words per line. The Tamil original employs poetic devices including assonance and balanced structure to enhance memorability and impact.",
+    "philosophical_depth": "This Kural reflects the practical wisdom tradition of Tamil philosophy, which sought to integrate ethical principles into everyday life. It shows influences from various philosophical traditions including indigenous Tamil thought, Jainism, and Buddhism.",
+    "contemporary_relevance": "Despite being written nearly two millennia ago, this teaching remains remarkably applicable to modern challenges and ethical dilemmas. Its wisdom transcends cultural and temporal boundaries to speak to universal human experiences.",
+    "emotional_resonance": "The Kural addresses fundamental human emotions and psychological insights that remain constant across generations. Its emotional impact comes from recognizing timeless human struggles and aspirations reflected in ancient wisdom."
+})
+
+
+def _load_kural_index() -> Dict[int, Dict[str, Any]]:
+    """
+    Load the Kural dataset once per process and index it by ID.
+
+    Returns:
+        Dictionary mapping Kural IDs to Kural details.
+    """
+    global _KURAL_INDEX
+    if _KURAL_INDEX is None:
+        with _KURAL_INDEX_LOCK:
+            if _KURAL_INDEX is None:
+                index = {}
+                try:
+                    with open(_KURAL_DATA_PATH, 'rb') as f:
+                        data = _loads(f.read())
+                    for kural in data["kurals"]:
+                        for key in _REQUIRED_KEYS:
+                            kural.setdefault(key, "")
+                        index[kural["id"]] = kural
+                except Exception:
+                    _log.warning("Error loading Kural data", exc_info=True)
+                _KURAL_INDEX = index
+    return _KURAL_INDEX
+
+
+def _parse_sections(analysis_text: str) -> Dict[str, str]:
+    """
+    Split the model's analysis into its numbered sections.
+
+    Args:
+        analysis_text: Analysis text returned by the model.
+
+    Returns:
+        Dictionary mapping section keys to their text, or {"raw_analysis": ...}
+        if no section headers were found.
+    """
+    matches = list(_SECTION_RE.finditer(analysis_text))
+    if not matches:
+        return {"raw_analysis": analysis_text}
+
+    sections = {}
+    for match, next_match in zip(matches, matches[1:] + [None]):
+        end = next_match.start() if next_match else len(analysis_text)
+        # Collapse the section's lines into a single paragraph
+        sections[_SECTION_KEYS[match.group(1)]] = " ".join(analysis_text[match.end():end].split())
+    return sections
+
+
+def _format_user_prompt(kural_details: Mapping[str, Any], tamil_override: str, english_override: str) -> str:
+    """
+    Fill in the user prompt for a Kural.
+
+    Args:
+        kural_details: Kural details.
+        tamil_override: Tamil text to analyze instead of the dataset's.
+        english_override: English translation to use instead of the dataset's.
+
+    Returns:
+        The user prompt.
+    """
+    return _USER_TEMPLATE(**{
+        **kural_details,
+        "tamil": tamil_override or kural_details["tamil"],
+        "english": english_override or kural_details["english"],
+        "explanation_tamil": textwrap.shorten(kural_details["explanation_tamil"], _EXPLANATION_WIDTH, placeholder="…"),
+        "explanation_english": textwrap.shorten(kural_details["explanation_english"], _EXPLANATION_WIDTH, placeholder="…")
+    })
+
+
+@functools.lru_cache(maxsize=2048)
+def _dataset_user_prompt(kural_id: int) -> str:
+    """
+    Build (once per Kural) the user prompt for a dataset Kural with its own text.
+
+    Args:
+        kural_id: ID of a Kural in the dataset.
+
+    Returns:
+        The user prompt.
+    """
+    return _format_user_prompt(_load_kural_index()[kural_id], "", "")
+
+
+def _merge_sections(chapter_sections: Dict[str, str], kural_sections: Dict[str, str]) -> Dict[str, str]:
+    """
+    Combine chapter-level and Kural-level sections in the usual section order.
+
+    Args:
+        chapter_sections: Sections from the chapter-level analysis.
+        kural_sections: Sections from the Kural-level analysis.
+
+    Returns:
+        Dictionary mapping section keys to their text.
+    """
+    merged = {**chapter_sections, **kural_sections}
+    ordered = {key: merged.pop(key) for key in _SECTION_KEYS.values() if key in merged}
+    return {**ordered, **merged}
+
 
 class InsightEngine:
     """
@@ -29,12 +287,45 @@ class InsightEngine:
         """
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.model = model
-        self.client = None
 
-        if OPENAI_AVAILABLE and self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
-
-    def _get_kural_details(self, kural_id: int) -> Dict[str, Any]:
+        try:
+            from valluvarai.config import config
+            insight_config = config.get_service_config("insight_engine")
+            self.cache_results = insight_config.get("cache_results", True)
+            self.share_chapter_context = insight_config.get("share_chapter_context", False)
+        except ImportError:
+            self.cache_results = True
+            self.share_chapter_context = False
+
+        # Chapter-level sections by (model, chapter), when sharing chapter context;
+        # filled from executor threads and analyze_many, hence the lock
+        self._chapter_cache: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._chapter_lock = threading.Lock()
+
+        # Shared ID index over the dataset, built here rather than on the
+        # first analyze() call
+        self._kurals_by_id = _load_kural_index()
+
+    @functools.cached_property
+    def client(self):
+        """OpenAI client, shared per API key and created on first use; None if OpenAI is unavailable."""
+        if not (OPENAI_AVAILABLE and self.api_key):
+            return None
+        with _CLIENT_LOCK:
+            if self.api_key not in _CLIENT_CACHE:
+                from openai import OpenAI
+                _CLIENT_CACHE[self.api_key] = OpenAI(api_key=self.api_key)
+            return _CLIENT_CACHE[self.api_key]
+
+    @functools.cached_property
+    def aclient(self):
+        """Async OpenAI client, created on first use; None if OpenAI is unavailable."""
+        if not (OPENAI_AVAILABLE and self.api_key):
+            return None
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=self.api_key)
+
+    def _get_kural_details(self, kural_id: int) -> Mapping[str, Any]:
         """
         Get detailed information about a Kural from the dataset.
 
@@ -42,33 +333,15 @@ class InsightEngine:
             kural_id: The ID of the Kural.
 
         Returns:
-            Dictionary with Kural details.
+            Kural details. Entries from the dataset are shared, so callers must
+            not modify them.
         """
-        # Get the directory of the current file
-        current_dir = Path(__file__).parent.parent
-        kural_data_path = current_dir / "kural_data" / "kural_1330.json"
+        kural = self._kurals_by_id.get(kural_id)
+        if kural is None:
+            # Return a default Kural if not found
+            return {"id": kural_id, **_DEFAULT_KURAL}
 
-        try:
-            with open(kural_data_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for kural in data["kurals"]:
-                    if kural["id"] == kural_id:
-                        return kural
-        except Exception as e:
-            print(f"Error loading Kural data: {e}")
-
-        # Return a default Kural if not found
-        return {
-            "id": kural_id,
-            "section": "Unknown",
-            "section_english": "Unknown",
-            "chapter": "Unknown",
-            "chapter_english": "Unknown",
-            "tamil": "",
-            "english": "",
-            "explanation_tamil": "",
-            "explanation_english": ""
-        }
+        return kural
 
     def analyze(
         self,
@@ -87,158 +360,588 @@ class InsightEngine:
         Returns:
             Dictionary with analysis results.
         """
+        # Don't spend an API call on input that can't produce an analysis
+        rejected = self._reject_input(kural_id, kural_text, kural_translation)
+        if rejected:
+            return rejected
+
         # Get additional details about the Kural
         kural_details = self._get_kural_details(kural_id)
 
-        # Add the text and translation to the details
-        kural_details["tamil"] = kural_text
-        kural_details["english"] = kural_translation
-
         # If OpenAI is available, use it for analysis
         if OPENAI_AVAILABLE and self.client:
-            return self._analyze_with_openai(kural_details)
+            return self._analyze_with_openai(kural_details, kural_text, kural_translation)
 
         # Otherwise, use a template-based approach
-        return self._analyze_template(kural_details)
+        return self._analyze_template(kural_details, kural_text, kural_translation)
 
-    def _analyze_with_openai(self, kural_details: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_many(
+        self,
+        items: List[Tuple[int, str, str]],
+        max_concurrency: int = 8
+    ) -> List[Any]:
         """
-        Analyze a Kural using OpenAI's API.
+        Analyze several Thirukkural verses concurrently.
 
         Args:
-            kural_details: Dictionary with Kural details.
+            items: List of (kural_id, kural_text, kural_translation) tuples.
+            max_concurrency: Maximum number of analyses in flight at once.
 
         Returns:
-            Dictionary with analysis results.
+            List of analysis results in the same order as `items`. An item
+            whose analysis raised is returned as the exception.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def analyze_one(item: Tuple[int, str, str]) -> Dict[str, Any]:
+            kural_id, kural_text, kural_translation = item
+            rejected = self._reject_input(kural_id, kural_text, kural_translation)
+            if rejected:
+                return rejected
+            kural_details = self._get_kural_details(kural_id)
+            if not (OPENAI_AVAILABLE and self.aclient):
+                return self._analyze_template(kural_details, kural_text, kural_translation)
+            async with semaphore:
+                return await self._analyze_with_openai_async(kural_details, kural_text, kural_translation)
+
+        return await asyncio.gather(*(analyze_one(item) for item in items), return_exceptions=True)
+
+    def submit_batch(self, kural_ids: List[int]) -> Optional[str]:
+        """
+        Submit analyses of many Kurals as an OpenAI batch job.
+
+        Batch jobs complete within 24 hours at a lower cost than individual
+        requests, which suits offline bulk runs over the whole dataset.
+
+        Args:
+            kural_ids: IDs of the Kurals to analyze.
+
+        Returns:
+            ID of the submitted batch, or None if it could not be submitted.
         """
+        if not (OPENAI_AVAILABLE and self.client):
+            _log.warning("OpenAI is not available; cannot submit a batch analysis")
+            return None
+
+        lines = []
+        for kural_id in kural_ids:
+            lines.append(json.dumps({
+                "custom_id": str(kural_id),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": self._build_messages(self._get_kural_details(kural_id)),
+                    "max_tokens": 1000,
+                    "temperature": 0.7
+                }
+            }, ensure_ascii=False))
+
+        try:
+            batch_file = self.client.files.create(
+                file=("kural_analyses.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            return batch.id
+        except Exception:
+            _log.warning("Error submitting batch analysis", exc_info=True)
+            return None
+
+    def fetch_batch(self, batch_id: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Collect the results of a batch submitted with `submit_batch`.
+
+        Args:
+            batch_id: ID of the batch.
+
+        Returns:
+            Dictionary mapping Kural IDs to analysis results. Empty if the
+            batch has not completed yet.
+        """
+        if not (OPENAI_AVAILABLE and self.client):
+            return {}
+
+        try:
+            batch = self.client.batches.retrieve(batch_id)
+            if batch.status != "completed" or not batch.output_file_id:
+                _log.info("Batch %s is not complete (status: %s)", batch_id, batch.status)
+                return {}
+
+            output = self.client.files.content(batch.output_file_id).text
+        except Exception:
+            _log.warning("Error fetching batch analysis", exc_info=True)
+            return {}
+
+        results = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            # One malformed or failed record mustn't discard the rest of the batch
+            try:
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    _log.warning(
+                        "Skipping failed batch record %s: %s",
+                        record.get("custom_id"), record.get("error") or response.get("status_code")
+                    )
+                    continue
+
+                kural_id = int(record["custom_id"])
+                analysis_text = response["body"]["choices"][0]["message"]["content"].strip()
+            except (ValueError, TypeError, KeyError, IndexError, AttributeError) as e:
+                _log.warning("Skipping malformed batch record (%r): %.200s", e, line)
+                continue
+
+            results[kural_id] = {
+                "kural_id": kural_id,
+                "analysis": _parse_sections(analysis_text)
+            }
+
+            # Cache the results as if they had been analyzed one by one
+            if self.cache_results:
+                get_cache().set("analysis", self._cache_key(self._get_kural_details(kural_id), "", ""), results[kural_id])
+
+        return results
+
+    def analyze_stream(
+        self,
+        kural_id: int,
+        kural_text: str,
+        kural_translation: str
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Analyze a Thirukkural verse, yielding the analysis as it is generated.
+
+        Args:
+            kural_id: The ID of the Kural.
+            kural_text: The Tamil text of the Kural.
+            kural_translation: The English translation of the Kural.
+
+        Yields:
+            Dictionaries of the form {"section": ..., "delta": ...}. Deltas for
+            the same section are consecutive and join with spaces into the
+            section text returned by analyze().
+        """
+        rejected = self._reject_input(kural_id, kural_text, kural_translation)
+        if rejected:
+            yield from self._yield_sections(rejected)
+            return
+
+        kural_details = self._get_kural_details(kural_id)
+
+        if not (OPENAI_AVAILABLE and self.client):
+            yield from self._yield_sections(self._analyze_template(kural_details, kural_text, kural_translation))
+            return
+
+        cache_key = self._cache_key(kural_details, kural_text, kural_translation)
+        if self.cache_results:
+            cached_analysis = get_cache().get("analysis", cache_key)
+            if cached_analysis:
+                yield from self._yield_sections(cached_analysis)
+                return
+
+        # Section text is emitted a line at a time, since a header can only be
+        # recognised once its whole line has arrived
+        chunks = []
+        pending = ""
+        section = None
         try:
-            system_prompt = """
-            You are a Tamil literature expert specializing in Thirukkural analysis.
-            Provide a comprehensive analysis of the given Thirukkural verse in the following format:
-
-            1. Historical Context: Explain when this concept was important in Tamil culture and history
-            2. Linguistic Analysis: Analyze the poetic devices, word choices, and structure
-            3. Philosophical Depth: Explain the philosophical underpinnings and ethical principles
-            4. Contemporary Relevance: How this Kural applies to modern life and current issues
-            5. Emotional Resonance: The emotional impact and psychological insights of this Kural
-
-            Keep each section concise (2-3 sentences) but insightful.
-            """
-
-            user_prompt = f"""
-            Thirukkural Details:
-            - ID: {kural_details['id']}
-            - Section: {kural_details.get('section', '')} ({kural_details.get('section_english', '')})
-            - Chapter: {kural_details.get('chapter', '')} ({kural_details.get('chapter_english', '')})
-            - Tamil Text: {kural_details.get('tamil', '')}
-            - English Translation: {kural_details.get('english', '')}
-            - Tamil Explanation: {kural_details.get('explanation_tamil', '')}
-            - English Explanation: {kural_details.get('explanation_english', '')}
-
-            Please provide a comprehensive analysis of this Thirukkural verse.
-            """
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(kural_details, kural_text, kural_translation),
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True
+            )
+
+            for chunk in response:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                chunks.append(chunk.choices[0].delta.content)
+                pending += chunks[-1]
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    section, delta = self._stream_line(line, section)
+                    if section and delta:
+                        yield {"section": section, "delta": delta}
+
+            section, delta = self._stream_line(pending, section)
+            if section and delta:
+                yield {"section": section, "delta": delta}
+
+        except Exception:
+            _log.warning("Error analyzing with OpenAI", exc_info=True)
+            if not section:
+                # Nothing has been streamed yet, so fall back to the template
+                yield from self._yield_sections(self._analyze_template(kural_details, kural_text, kural_translation))
+            return
+
+        analysis_text = "".join(chunks).strip()
+        if not section:
+            # No section headers, so hand back the raw text
+            yield {"section": "raw_analysis", "delta": analysis_text}
+
+        if self.cache_results:
+            get_cache().set("analysis", cache_key, {
+                "kural_id": kural_details["id"],
+                "analysis": _parse_sections(analysis_text)
+            })
+
+    def _reject_input(self, kural_id: int, kural_text: str, kural_translation: str) -> Optional[Dict[str, Any]]:
+        """
+        Answer requests that can't benefit from the model without calling it.
+
+        Args:
+            kural_id: The ID of the Kural.
+            kural_text: The Tamil text of the Kural.
+            kural_translation: The English translation of the Kural.
+
+        Returns:
+            Analysis result to return immediately, or None to go ahead.
+        """
+        if not isinstance(kural_id, int) or not 1 <= kural_id <= _KURAL_COUNT:
+            return {"kural_id": kural_id, "analysis": {"error": "invalid input"}}
+
+        # With neither the dataset nor the caller providing the verse, there
+        # is nothing for the model to analyze
+        if kural_id not in self._kurals_by_id and not (kural_text or "").strip() and not (kural_translation or "").strip():
+            return self._analyze_template(self._get_kural_details(kural_id))
+
+        return None
+
+    @staticmethod
+    def _stream_line(line: str, section: Optional[str]):
+        """
+        Classify one line of streamed analysis text.
+
+        Args:
+            line: A complete line of the model's output.
+            section: Key of the section being streamed, if any.
+
+        Returns:
+            Tuple of (section key, text to emit for the line).
+        """
+        match = _SECTION_RE.match(line)
+        if match:
+            return _SECTION_KEYS[match.group(1)], line[match.end():].strip()
+        return section, line.strip()
+
+    @staticmethod
+    def _yield_sections(result: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+        """
+        Stream an already complete analysis one section at a time.
+
+        Args:
+            result: Dictionary with analysis results.
+
+        Yields:
+            Dictionaries of the form {"section": ..., "delta": ...}.
+        """
+        for section, text in result["analysis"].items():
+            yield {"section": section, "delta": text}
+
+    def _cache_key(
+        self,
+        kural_details: Mapping[str, Any],
+        tamil_override: str,
+        english_override: str
+    ) -> Dict[str, Any]:
+        """
+        Build the cache key for an OpenAI analysis.
+
+        Args:
+            kural_details: Kural details.
+            tamil_override: Tamil text to analyze instead of the dataset's.
+            english_override: English translation to use instead of the dataset's.
+
+        Returns:
+            Dictionary identifying the analysis request.
+        """
+        # An override equal to the dataset text is no override, as in
+        # _build_messages, so batch results and direct calls share one key
+        if tamil_override == kural_details.get("tamil"):
+            tamil_override = ""
+        if english_override == kural_details.get("english"):
+            english_override = ""
+
+        return {
+            "model": self.model,
+            "prompt_version": _PROMPT_VERSION,
+            "kural_id": kural_details["id"],
+            "tamil": tamil_override,
+            "english": english_override,
+            "share_chapter_context": self.share_chapter_context
+        }
+
+    def _build_messages(
+        self,
+        kural_details: Mapping[str, Any],
+        tamil_override: str = "",
+        english_override: str = "",
+        system_prompt: str = _SYSTEM_PROMPT
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages asking the model to analyze a Kural.
+
+        Args:
+            kural_details: Kural details.
+            tamil_override: Tamil text to analyze instead of the dataset's.
+            english_override: English translation to use instead of the dataset's.
+            system_prompt: System prompt describing the sections to write.
+
+        Returns:
+            List of chat messages.
+        """
+        # The prompt for a dataset Kural with its own text is built only once
+        if (kural_details["id"] in self._kurals_by_id
+                and tamil_override in ("", kural_details["tamil"])
+                and english_override in ("", kural_details["english"])):
+            user_prompt = _dataset_user_prompt(kural_details["id"])
+        else:
+            user_prompt = _format_user_prompt(kural_details, tamil_override, english_override)
+
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def _shares_chapter_context(self, kural_details: Mapping[str, Any]) -> bool:
+        """Whether to split this Kural's analysis into chapter and Kural requests."""
+        return self.share_chapter_context and kural_details["id"] in self._kurals_by_id
 
+    def _chapter_sections(self, kural_details: Mapping[str, Any]) -> Dict[str, str]:
+        """
+        Get the chapter-level sections for a Kural's chapter, asking the model once per chapter.
+
+        Args:
+            kural_details: Kural details.
+
+        Returns:
+            Dictionary mapping section keys to their text. Empty if the model's
+            reply didn't follow the section format.
+        """
+        memo_key = (self.model, kural_details["chapter_english"])
+        with self._chapter_lock:
+            sections = self._chapter_cache.get(memo_key)
+        if sections is not None:
+            return sections
+
+        cache_key = {
+            "model": self.model,
+            "prompt_version": _PROMPT_VERSION,
+            "chapter": kural_details["chapter_english"]
+        }
+        sections = get_cache().get("analysis", cache_key) if self.cache_results else None
+
+        if not sections:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
+                    {"role": "system", "content": _CHAPTER_SYSTEM_PROMPT},
+                    {"role": "user", "content": _CHAPTER_USER_TEMPLATE(**kural_details)}
                 ],
                 max_tokens=1000,
                 temperature=0.7
             )
+            sections = _parse_sections(response.choices[0].message.content.strip())
+            if "raw_analysis" in sections:
+                # Unstructured text would end up mixed into the Kural's sections;
+                # drop it, and don't share it with the rest of the chapter
+                _log.warning("Chapter analysis for %s didn't follow the format", kural_details["chapter_english"])
+                return {}
+            if self.cache_results:
+                get_cache().set("analysis", cache_key, sections)
+
+        with self._chapter_lock:
+            self._chapter_cache[memo_key] = sections
+        return sections
+
+    def _analyze_with_openai(
+        self,
+        kural_details: Mapping[str, Any],
+        tamil_override: str = "",
+        english_override: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Analyze a Kural using OpenAI's API.
 
-            analysis_text = response.choices[0].message.content.strip()
+        Args:
+            kural_details: Kural details.
+            tamil_override: Tamil text to analyze instead of the dataset's.
+            english_override: English translation to use instead of the dataset's.
 
-            # Parse the analysis text into sections
-            sections = {}
-            current_section = None
+        Returns:
+            Dictionary with analysis results.
+        """
+        # Identical requests reuse the earlier analysis instead of calling the API
+        cache_key = self._cache_key(kural_details, tamil_override, english_override)
+        if self.cache_results:
+            cached_analysis = get_cache().get("analysis", cache_key)
+            if cached_analysis:
+                return cached_analysis
 
-            for line in analysis_text.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
+        try:
+            if self._shares_chapter_context(kural_details):
+                # Fetch the chapter-level sections alongside the Kural's own
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    chapter_future = executor.submit(self._chapter_sections, kural_details)
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._build_messages(
+                            kural_details, tamil_override, english_override, _KURAL_SYSTEM_PROMPT
+                        ),
+                        max_tokens=1000,
+                        temperature=0.7
+                    )
+                    kural_sections = _parse_sections(response.choices[0].message.content.strip())
+                    chapter_sections = chapter_future.result()
+                    sections = _merge_sections(chapter_sections, kural_sections)
+                    # Without the chapter sections the analysis is incomplete
+                    complete = bool(chapter_sections)
+            else:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._build_messages(kural_details, tamil_override, english_override),
+                    max_tokens=1000,
+                    temperature=0.7
+                )
+
+                analysis_text = response.choices[0].message.content.strip()
+
+                # Parse the analysis text into sections
+                sections = _parse_sections(analysis_text)
+                complete = True
+
+            result = {
+                "kural_id": kural_details["id"],
+                "analysis": sections
+            }
 
-                # Check if this is a section header
-                if line.startswith("1. Historical Context:"):
-                    current_section = "historical_context"
-                    sections[current_section] = line.replace("1. Historical Context:", "").strip()
-                elif line.startswith("2. Linguistic Analysis:"):
-                    current_section = "linguistic_analysis"
-                    sections[current_section] = line.replace("2. Linguistic Analysis:", "").strip()
-                elif line.startswith("3. Philosophical Depth:"):
-                    current_section = "philosophical_depth"
-                    sections[current_section] = line.replace("3. Philosophical Depth:", "").strip()
-                elif line.startswith("4. Contemporary Relevance:"):
-                    current_section = "contemporary_relevance"
-                    sections[current_section] = line.replace("4. Contemporary Relevance:", "").strip()
-                elif line.startswith("5. Emotional Resonance:"):
-                    current_section = "emotional_resonance"
-                    sections[current_section] = line.replace("5. Emotional Resonance:", "").strip()
-                elif current_section:
-                    sections[current_section] += " " + line
-
-            # If parsing failed, use the raw text
-            if not sections:
-                sections = {
-                    "raw_analysis": analysis_text
-                }
+            # Cache the results
+            if self.cache_results and complete:
+                get_cache().set("analysis", cache_key, result)
+
+            return result
 
-            return {
+        except Exception:
+            _log.warning("Error analyzing with OpenAI", exc_info=True)
+            # Fall back to template-based analysis
+            return self._analyze_template(kural_details, tamil_override, english_override)
+
+    async def _analyze_with_openai_async(
+        self,
+        kural_details: Mapping[str, Any],
+        tamil_override: str = "",
+        english_override: str = "",
+        max_retries: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Analyze a Kural using OpenAI's async API, backing off on rate limits.
+
+        Args:
+            kural_details: Kural details.
+            tamil_override: Tamil text to analyze instead of the dataset's.
+            english_override: English translation to use instead of the dataset's.
+            max_retries: Number of times to retry a rate-limited request.
+
+        Returns:
+            Dictionary with analysis results.
+        """
+        from openai import RateLimitError
+
+        cache_key = self._cache_key(kural_details, tamil_override, english_override)
+        if self.cache_results:
+            cached_analysis = get_cache().get("analysis", cache_key)
+            if cached_analysis:
+                return cached_analysis
+
+        async def complete(messages: List[Dict[str, str]]) -> str:
+            for attempt in range(max_retries + 1):
+                try:
+                    response = await self.aclient.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        max_tokens=1000,
+                        temperature=0.7
+                    )
+                    return response.choices[0].message.content.strip()
+                except RateLimitError:
+                    if attempt == max_retries:
+                        raise
+                    # Exponential backoff with jitter
+                    await asyncio.sleep(min(2 ** attempt, 30) + random.uniform(0, 1))
+
+        try:
+            if self._shares_chapter_context(kural_details):
+                # Fetch the chapter-level sections alongside the Kural's own
+                loop = asyncio.get_running_loop()
+                chapter_sections, analysis_text = await asyncio.gather(
+                    loop.run_in_executor(None, self._chapter_sections, kural_details),
+                    complete(self._build_messages(
+                        kural_details, tamil_override, english_override, _KURAL_SYSTEM_PROMPT
+                    ))
+                )
+                sections = _merge_sections(chapter_sections, _parse_sections(analysis_text))
+                # Without the chapter sections the analysis is incomplete
+                complete = bool(chapter_sections)
+            else:
+                analysis_text = await complete(
+                    self._build_messages(kural_details, tamil_override, english_override)
+                )
+                sections = _parse_sections(analysis_text)
+                complete = True
+
+            result = {
                 "kural_id": kural_details["id"],
                 "analysis": sections
             }
 
-        except Exception as e:
-            print(f"Error analyzing with OpenAI: {e}")
+            # Cache the results
+            if self.cache_results and complete:
+                get_cache().set("analysis", cache_key, result)
+
+            return result
+
+        except Exception:
+            _log.warning("Error analyzing with OpenAI", exc_info=True)
             # Fall back to template-based analysis
-            return self._analyze_template(kural_details)
+            return self._analyze_template(kural_details, tamil_override, english_override)
 
-    def _analyze_template(self, kural_details: Dict[str, Any]) -> Dict[str, Any]:
+    def _analyze_template(
+        self,
+        kural_details: Mapping[str, Any],
+        tamil_override: str = "",
+        english_override: str = ""
+    ) -> Dict[str, Any]:
         """
         Provide a template-based analysis when OpenAI is not available.
 
         Args:
-            kural_details: Dictionary with Kural details.
+            kural_details: Kural details.
+            tamil_override: Tamil text to analyze instead of the dataset's.
+            english_override: English translation to use instead of the dataset's.
 
         Returns:
             Dictionary with analysis results.
         """
         # Get the chapter in English
-        chapter_english = kural_details.get("chapter_english", "").lower()
+        chapter_english = kural_details["chapter_english"].lower()
 
-        # Template analyses based on the chapter
-        if "forgiveness" in chapter_english or "patience" in chapter_english:
-            analysis = {
-                "historical_context": "Forgiveness was a cornerstone virtue in ancient Tamil society, especially during the Sangam period (300 BCE to 300 CE) when conflicts between kingdoms were common. Thiruvalluvar emphasized forgiveness as a path to peace in an era of frequent warfare.",
-                "linguistic_analysis": "This Kural uses contrasting imagery of strength and weakness, employing a paradox to convey that true power lies in restraint rather than retaliation. The Tamil word 'பொறை' (porai) carries deeper connotations than the English 'forgiveness,' suggesting both patience and emotional fortitude.",
-                "philosophical_depth": "The verse reflects the influence of both Jain and Buddhist philosophies on Tamil ethics, particularly the concept of ahimsa (non-violence). It presents forgiveness not as passive submission but as an active choice requiring greater inner strength than revenge.",
-                "contemporary_relevance": "In today's conflict-ridden world, this Kural offers wisdom for both personal relationships and international diplomacy. The principle that true strength lies in forgiveness rather than retaliation remains revolutionary in contexts from social media disputes to geopolitical tensions.",
-                "emotional_resonance": "The Kural speaks to the universal human struggle between the immediate emotional satisfaction of revenge and the deeper peace that comes from letting go. It acknowledges the difficulty of forgiveness while affirming its ultimate reward of inner freedom."
-            }
-        elif "love" in chapter_english:
-            analysis = {
-                "historical_context": "The concept of selfless love was central to Tamil culture during the Sangam period, influencing both personal relationships and community structures. Thiruvalluvar's teachings on love emerged during a time when Tamil society was developing sophisticated ethical frameworks for human connections.",
-                "linguistic_analysis": "This Kural employs powerful contrasting imagery between the self-centered and the loving person. The Tamil original uses the word 'எலும்பு' (elumbu/bone) metaphorically to suggest that even one's most fundamental physical structure belongs to others when one truly loves.",
-                "philosophical_depth": "The verse reflects the Tamil philosophical concept of 'அன்பு' (anbu), which transcends Western notions of love to encompass a universal compassion and selflessness. It suggests that true identity is found not in self-preservation but in giving oneself to others.",
-                "contemporary_relevance": "In an age of increasing individualism and self-focus, this Kural challenges modern assumptions about personal boundaries and self-care. It offers a radical alternative to consumer culture by suggesting that fulfillment comes through giving rather than acquiring.",
-                "emotional_resonance": "The Kural touches on the paradoxical human experience that our greatest joy often comes when we forget ourselves in service to others. It validates the emotional truth that love expands rather than diminishes our sense of self."
-            }
-        elif "learning" in chapter_english or "education" in chapter_english:
-            analysis = {
-                "historical_context": "Education was highly valued in ancient Tamil society, with centers of learning established throughout the Tamil region during the Sangam period. Thiruvalluvar emphasized the practical application of knowledge at a time when formal education was becoming more structured.",
-                "linguistic_analysis": "This Kural employs a concise, imperative structure that emphasizes both the acquisition and application of knowledge. The repetition of 'கற்க' (karka/learn) creates a rhythmic emphasis that underscores the importance of thorough learning.",
-                "philosophical_depth": "The verse reflects the pragmatic orientation of Tamil ethics, which valued knowledge not for its own sake but for its transformative potential. It suggests a holistic view of education that encompasses both intellectual understanding and moral character.",
-                "contemporary_relevance": "In today's information-saturated world, this Kural reminds us that true education goes beyond accumulating facts to living in accordance with what we've learned. It speaks to current educational debates about the purpose of learning and the gap between knowledge and wisdom.",
-                "emotional_resonance": "The Kural addresses the universal human tendency to separate knowing from doing, challenging us to integrate our understanding into our character. It suggests that the emotional satisfaction of learning comes not from what we know but from how we live."
-            }
+        # Use the canned analysis for the first topic the chapter mentions
+        for keyword, topic in _TOPIC_KEYWORDS.items():
+            if keyword in chapter_english:
+                analysis = dict(_TEMPLATE_ANALYSES[topic])
+                break
         else:
             analysis = {
-                "historical_context": f"This Kural from the chapter on {kural_details.get('chapter_english', '')} reflects the ethical priorities of Tamil society during the Sangam period (300 BCE to 300 CE). Thiruvalluvar's teachings on this subject would have provided practical guidance for daily life in ancient Tamil Nadu.",
-                "linguistic_analysis": "The verse demonstrates Thiruvalluvar's characteristic economy of language, conveying profound meaning in just seven words per line. The Tamil original employs poetic devices including assonance and balanced structure to enhance memorability and impact.",
-                "philosophical_depth": "This Kural reflects the practical wisdom tradition of Tamil philosophy, which sought to integrate ethical principles into everyday life. It shows influences from various philosophical traditions including indigenous Tamil thought, Jainism, and Buddhism.",
-                "contemporary_relevance": "Despite being written nearly two millennia ago, this teaching remains remarkably applicable to modern challenges and ethical dilemmas. Its wisdom transcends cultural and temporal boundaries to speak to universal human experiences.",
-                "emotional_resonance": "The Kural addresses fundamental human emotions and psychological insights that remain constant across generations. Its emotional impact comes from recognizing timeless human struggles and aspirations reflected in ancient wisdom."
+                "historical_context": f"This Kural from the chapter on {kural_details['chapter_english']} reflects the ethical priorities of Tamil society during the Sangam period (300 BCE to 300 CE). Thiruvalluvar's teachings on this subject would have provided practical guidance for daily life in ancient Tamil Nadu.",
+                **_GENERIC_ANALYSIS
             }
 
         return {
@@ -3,24 +3,197 @@ Video Builder - Creates videos from images and audio narration with enhanced tra
 """
 
 import os
+import hashlib
 import tempfile
 import subprocess
 import random
 import json
-import shutil
+import asyncio
+import collections
+import heapq
+import itertools
+import math
+import re
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Union, Literal
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Tuple, Union, Literal, Iterable, Iterator, Set
+
+import numpy as np
+
+try:
+    import av
+    PYAV_AVAILABLE = True
+except ImportError:
+    PYAV_AVAILABLE = False
 
 from valluvarai.config import config
-from valluvarai.utils.cache import cache
+from valluvarai.utils.cache import get_cache
+
+# Hardware H.264 encoders in order of preference, as
+# (encoder, input arguments, output arguments)
+_VAAPI_DEVICE = "/dev/dri/renderD128"
+_VAAPI_UPLOAD = "format=nv12|vaapi,hwupload"
+_HW_ENCODERS = (
+    ("h264_nvenc", (), ("-pix_fmt", "yuv420p", "-tune", "hq", "-rc", "vbr")),
+    ("h264_vaapi", ("-vaapi_device", _VAAPI_DEVICE), ()),
+    ("h264_qsv", (), ("-pix_fmt", "nv12")),
+)
+_SOFTWARE_ENCODER = ("libx264", (), ("-pix_fmt", "yuv420p"))
+
+# Speed and quality settings of each encoder for the output quality tiers
+_ENCODER_QUALITY = {
+    "h264_nvenc": {
+        "preview": ("-preset", "p1", "-cq", "28"),
+        "standard": ("-preset", "p4", "-cq", "23"),
+        "archive": ("-preset", "p7", "-cq", "20"),
+    },
+    "h264_vaapi": {
+        "preview": ("-qp", "28"),
+        "standard": ("-qp", "23"),
+        "archive": ("-qp", "20"),
+    },
+    "h264_qsv": {
+        "preview": ("-preset", "veryfast", "-global_quality", "28"),
+        "standard": ("-preset", "medium", "-global_quality", "23"),
+        "archive": ("-preset", "veryslow", "-global_quality", "20"),
+    },
+    "libx264": {
+        "preview": ("-preset", "ultrafast", "-crf", "28"),
+        "standard": ("-preset", "medium", "-crf", "23"),
+        "archive": ("-preset", "slow", "-crf", "20"),
+    },
+}
+
+# Settings of each encoder for the quality tiers when every frame of the video is the
+# same still: the fastest preset is enough for preview and standard, while archive keeps
+# its own preset and only gets still-image tuning
+_STILL_ENCODER_ARGS = {
+    "h264_nvenc": {
+        "preview": ("-preset", "p1", "-tune", "ll"),
+        "standard": ("-preset", "p1", "-tune", "ll"),
+    },
+    "h264_qsv": {
+        "preview": ("-preset", "veryfast"),
+        "standard": ("-preset", "veryfast"),
+    },
+    "libx264": {
+        "preview": ("-preset", "ultrafast", "-tune", "stillimage"),
+        "standard": ("-preset", "ultrafast", "-tune", "stillimage"),
+        "archive": ("-tune", "stillimage"),
+    },
+}
+
+OutputQuality = Literal['preview', 'standard', 'archive']
+
+# MP4 layouts: index up front for progressive download, or fragments for live streaming
+_MOVFLAGS_FASTSTART = "+faststart"
+_MOVFLAGS_STREAMING = "+frag_keyframe+empty_moov+default_base_moof"
+
+
+def _quality_args(encoder: str, quality: str) -> Tuple[str, ...]:
+    """Speed and quality arguments of an encoder for a quality tier, falling back to 'standard'."""
+    tiers = _ENCODER_QUALITY[encoder]
+    return tiers.get(quality, tiers["standard"])
+
+
+def _still_args(encoder: str, quality: str) -> Tuple[str, ...]:
+    """Arguments added after `_quality_args` when encoding a single still, falling back to 'standard'."""
+    if quality not in _ENCODER_QUALITY[encoder]:
+        quality = "standard"
+    return _STILL_ENCODER_ARGS.get(encoder, {}).get(quality, ())
+
+# Frame size every image is scaled and padded to, matching the zoompan effects
+_FRAME_SIZE = (1024, 1024)
+# Length in seconds of the xfade transitions in TRANSITIONS
+_XFADE_DURATION = 1
+# Filtergraphs longer than this are passed as a script file instead of on the command line
+_INLINE_GRAPH_MAX_CHARS = 8192
+
+# zoompan and xfade run on a single thread unless FFmpeg is told otherwise.
+# Splitting the graph into xstack branches would spread a single filter too.
+_FILTER_THREAD_ARGS = ("-filter_threads", str(os.cpu_count() or 1),
+                       "-filter_complex_threads", str(os.cpu_count() or 1))
+
+# Subdirectory of the output directory holding pre-rendered effect clips
+_CLIP_CACHE_DIR = "_clipcache"
+
+# How much of FFmpeg's log is kept for error reports
+_STDERR_TAIL_BYTES = 4096
+
+# Top-level filters of a comma-separated chain, skipping commas in quotes
+_FILTER_SPLIT = re.compile(r"(?:[^,']|'[^']*')+")
+
+# Frames the PyAV path lets the encoder thread fall behind the filtergraph
+_PYAV_ENCODE_QUEUE = 8
+
+# Consumer GPU drivers limit how many NVENC sessions can be open at once
+_NVENC_SESSIONS = threading.BoundedSemaphore(2)
+
+
+@functools.lru_cache(maxsize=256)
+def _file_sha256(file_path: str, mtime_ns: int, size: int) -> str:
+    """
+    SHA-256 digest of a file's contents.
+
+    The modification time and size are part of the cache key only, so an edited
+    file is hashed again.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_hw_encoder() -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Find the first hardware H.264 encoder FFmpeg can actually use, probed once per process.
+
+    Returns:
+        Tuple of (encoder name, input arguments, output arguments), falling back to libx264.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return _SOFTWARE_ENCODER
+
+    listed = result.stdout.decode(errors="replace")
+    for encoder, input_args, output_args in _HW_ENCODERS:
+        if f" {encoder} " not in listed:
+            continue
+        if encoder == "h264_vaapi" and not os.path.exists(_VAAPI_DEVICE):
+            continue
+
+        # Being compiled in doesn't mean there is a device, so encode a single test frame
+        probe = ["ffmpeg", "-hide_banner", "-loglevel", "error", *input_args,
+                 "-f", "lavfi", "-i", "color=black:s=256x256", "-frames:v", "1"]
+        if encoder == "h264_vaapi":
+            probe.extend(["-vf", _VAAPI_UPLOAD])
+        probe.extend(["-c:v", encoder, "-f", "null", "-"])
+        try:
+            subprocess.run(probe, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+            return encoder, input_args, output_args
+        except (subprocess.SubprocessError, OSError):
+            continue
+
+    return _SOFTWARE_ENCODER
+
 
 class VideoBuilder:
     """
     Creates videos from images and audio narration using FFmpeg with enhanced transitions and effects.
     """
     
-    # Define available transitions
-    TRANSITIONS = {
+    # Define available transitions (read-only, shared by every instance)
+    TRANSITIONS = MappingProxyType({
         'fade': 'fade=t=in:st=0:d=1,fade=t=out:st={duration-1}:d=1',
         'crossfade': 'xfade=transition=fade:duration=1',
         'fadeblack': 'xfade=transition=fadeblack:duration=1',
@@ -36,10 +209,10 @@ class VideoBuilder:
         'wiperight': 'xfade=transition=wiperight:duration=1',
         'wipeup': 'xfade=transition=wipeup:duration=1',
         'wipedown': 'xfade=transition=wipedown:duration=1',
-        'zoomin': 'zoompan=z=\'min(zoom+0.0015,1.5)\':d=25:s=1024x1024',
-        'zoomout': 'zoompan=z=\'if(lte(zoom,1.0),1.5,max(1.001,zoom-0.0015))\':d=25:s=1024x1024',
-        'kenburns': 'zoompan=z=\'min(max(zoom,pzoom)+0.0015,1.5)\':d=25:s=1024x1024:x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\'',
-    }
+        'zoomin': 'zoompan=z=\'min(pzoom+0.0015,1.5)\':d=1:s=1024x1024',
+        'zoomout': 'zoompan=z=\'if(lte(pzoom,1.0),1.5,max(1.001,pzoom-0.0015))\':d=1:s=1024x1024',
+        'kenburns': 'zoompan=z=\'min(max(zoom,pzoom)+0.0015,1.5)\':d=1:s=1024x1024:x=\'iw/2-(iw/zoom/2)\':y=\'ih/2-(ih/zoom/2)\'',
+    })
     
     # Define available music genres
     MUSIC_GENRES = {
@@ -83,6 +256,7 @@ class VideoBuilder:
             
         # Create music directory if it doesn't exist
         os.makedirs(self.music_dir, exist_ok=True)
+        self._music_all, self._music_by_genre = self._index_music()
         
         # Set default parameters from config
         self.default_fps = video_config.get("default_fps", 24)
@@ -91,6 +265,16 @@ class VideoBuilder:
         self.default_transition = video_config.get("default_transition", "crossfade")
         self.enable_effects = video_config.get("enable_effects", True)
         self.subtitle_style = video_config.get("subtitle_style", "FontSize=24,Alignment=2,BorderStyle=3,Outline=1,Shadow=0,MarginV=25")
+        self.hardware_encoding = video_config.get("hardware_encoding", True)
+        self.default_quality = video_config.get("output_quality", "standard")
+        self.cache_effect_clips = video_config.get("cache_effect_clips", True)
+        self.use_pyav = video_config.get("use_pyav", False) and PYAV_AVAILABLE
+
+        # Pick the H.264 encoder once; hardware encoders are much faster than libx264
+        encoder, input_args, output_args = _detect_hw_encoder() if self.hardware_encoding else _SOFTWARE_ENCODER
+        self._hw_encoder = encoder
+        self._hw_input_args = list(input_args)
+        self._hw_output_args = list(output_args)
     
     def create_video(
         self,
@@ -104,7 +288,9 @@ class VideoBuilder:
         transition: Optional[str] = None,
         music_genre: Optional[str] = None,
         apply_effects: Optional[bool] = None,
-        cache_result: bool = True
+        cache_result: bool = True,
+        output_quality: Optional[OutputQuality] = None,
+        streaming: bool = False
     ) -> Dict[str, Any]:
         """
         Create a video from images and audio narration with enhanced transitions and effects.
@@ -126,6 +312,83 @@ class VideoBuilder:
                 'cinematic', 'meditation'.
             apply_effects: Whether to apply visual effects to the video. If None, uses the default from config.
             cache_result: Whether to cache the result for future use.
+            output_quality: Encoder speed/quality tier. If None, uses the default from config.
+                Options: 'preview' (fastest), 'standard', 'archive' (best quality).
+            streaming: Whether to write a fragmented MP4 that can be played while it is
+                still being delivered, instead of a regular one with its index up front.
+            
+        Returns:
+            Dictionary with video information.
+        """
+        coro = self.create_video_async(
+            images,
+            audio,
+            tamil_text,
+            english_text,
+            duration,
+            fps,
+            add_music,
+            transition,
+            music_genre,
+            apply_effects,
+            cache_result,
+            output_quality,
+            streaming
+        )
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+
+        # asyncio.run can't nest inside a running loop (Jupyter, async callers),
+        # so give the coroutine its own loop on a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
+    async def create_video_async(
+        self,
+        images: List[Dict[str, Any]],
+        audio: Dict[str, Dict[str, Any]],
+        tamil_text: Optional[str] = None,
+        english_text: Optional[str] = None,
+        duration: Optional[int] = None,
+        fps: Optional[int] = None,
+        add_music: Optional[bool] = None,
+        transition: Optional[str] = None,
+        music_genre: Optional[str] = None,
+        apply_effects: Optional[bool] = None,
+        cache_result: bool = True,
+        output_quality: Optional[OutputQuality] = None,
+        streaming: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create a video asynchronously; see create_video.
+
+        Music selection and subtitle writing run alongside the image sequence assembly,
+        and FFmpeg runs as an asyncio subprocess.
+        
+        Args:
+            images: List of dictionaries with image information.
+            audio: Dictionary with audio information for different languages.
+            tamil_text: Tamil story text for subtitles.
+            english_text: English story text for subtitles.
+            duration: Target duration of the video in seconds. If None, uses the default from config.
+            fps: Frames per second for the video. If None, uses the default from config.
+            add_music: Whether to add background music. If None, uses the default from config.
+            transition: Transition effect to use between images. If None, uses the default from config.
+                Options: 'fade', 'crossfade', 'fadeblack', 'fadewhite', 'slideleft', 'slideright',
+                'slideup', 'slidedown', 'circlecrop', 'rectcrop', 'distance', 'wipeleft',
+                'wiperight', 'wipeup', 'wipedown', 'zoomin', 'zoomout', 'kenburns'.
+            music_genre: Genre of background music to use. If None, selects randomly.
+                Options: 'ambient', 'classical', 'emotional', 'inspirational', 'traditional',
+                'cinematic', 'meditation'.
+            apply_effects: Whether to apply visual effects to the video. If None, uses the default from config.
+            cache_result: Whether to cache the result for future use.
+            output_quality: Encoder speed/quality tier. If None, uses the default from config.
+                Options: 'preview' (fastest), 'standard', 'archive' (best quality).
+            streaming: Whether to write a fragmented MP4 that can be played while it is
+                still being delivered, instead of a regular one with its index up front.
             
         Returns:
             Dictionary with video information.
@@ -136,41 +399,41 @@ class VideoBuilder:
         add_music_value = add_music if add_music is not None else self.add_music_default
         transition_value = transition if transition is not None else self.default_transition
         apply_effects_value = apply_effects if apply_effects is not None else self.enable_effects
+        quality_value = output_quality if output_quality is not None else self.default_quality
         
-        # Check if we have a cached result
-        if cache_result:
-            cache_key = {
-                "images": [img.get("file_path", "") for img in images],
-                "audio": {k: v.get("file_path", "") for k, v in audio.items()},
-                "tamil_text": tamil_text,
-                "english_text": english_text,
-                "duration": duration_value,
-                "fps": fps_value,
-                "add_music": add_music_value,
-                "transition": transition_value,
-                "music_genre": music_genre,
-                "apply_effects": apply_effects_value
-            }
-            cached_result = cache.get("videos", cache_key)
-            if cached_result and os.path.exists(cached_result.get("file_path", "")):
-                return cached_result
-        
-        # Check if FFmpeg is available
-        if not self._is_ffmpeg_available():
-            return {
-                "success": False,
-                "error": "FFmpeg is not available. Please install FFmpeg to generate videos.",
-                "file_path": None
-            }
+        # Everything about the request except its input files
+        settings = {
+            "tamil_text": tamil_text,
+            "english_text": english_text,
+            "duration": duration_value,
+            "fps": fps_value,
+            "add_music": add_music_value,
+            "transition": transition_value,
+            "music_genre": music_genre,
+            "apply_effects": apply_effects_value,
+            "output_quality": quality_value,
+            "streaming": streaming
+        }
         
         try:
-            # Filter out images with missing file paths
-            valid_images = [img for img in images if img.get("file_path") and os.path.exists(img.get("file_path"))]
+            # Check if we have a cached result
+            if cache_result:
+                cache_key = self._cache_key({
+                    "images": [self._file_identity(img.get("file_path", "")) for img in images],
+                    "audio": {k: self._file_identity(v.get("file_path", "")) for k, v in audio.items()},
+                    **settings
+                })
+                cached_result = get_cache().get("videos", cache_key)
+                if cached_result and os.path.exists(cached_result.get("file_path", "")):
+                    return cached_result
             
-            if not valid_images:
+            loop = asyncio.get_running_loop()
+
+            # Check if FFmpeg is available
+            if not await loop.run_in_executor(None, self._is_ffmpeg_available):
                 return {
                     "success": False,
-                    "error": "No valid images available for video creation.",
+                    "error": "FFmpeg is not available. Please install FFmpeg to generate videos.",
                     "file_path": None
                 }
             
@@ -178,50 +441,96 @@ class VideoBuilder:
             tamil_audio = audio.get("tamil", {}).get("file_path") if "tamil" in audio else None
             english_audio = audio.get("english", {}).get("file_path") if "english" in audio else None
             
+            # Look up every input file in one pass per directory
+            existing = await loop.run_in_executor(
+                None, self._existing_paths, [img.get("file_path") for img in images] + [tamil_audio, english_audio]
+            )
+            
+            # Filter out images with missing file paths
+            valid_images = [img for img in images if img.get("file_path") in existing]
+            
+            if not valid_images:
+                return {
+                    "success": False,
+                    "error": "No valid images available for video creation.",
+                    "file_path": None
+                }
+            
             # Determine which audio to use
             audio_file = None
-            if tamil_audio and os.path.exists(tamil_audio):
+            if tamil_audio in existing:
                 audio_file = tamil_audio
-            elif english_audio and os.path.exists(english_audio):
+            elif english_audio in existing:
                 audio_file = english_audio
             
-            # Create a temporary directory for intermediate files
-            temp_dir = Path(tempfile.mkdtemp())
-            
-            # Select background music if requested
-            background_music = None
-            if add_music_value and not audio_file:
-                background_music = self._select_background_music(music_genre, temp_dir)
-            
-            # Create image sequence with transitions
-            image_sequence = self._create_image_sequence_with_transitions(
-                valid_images, 
-                duration_value, 
-                transition_value,
-                apply_effects_value,
-                temp_dir
-            )
-            
-            # Create subtitles if text is provided
-            subtitle_file = None
-            if tamil_text or english_text:
-                subtitle_file = self._create_subtitles(tamil_text, english_text, duration_value, temp_dir)
-            
-            # Generate the video
-            timestamp = int(os.path.getmtime(valid_images[0]['file_path']))
-            output_file = self.output_dir / f"valluvar_story_{timestamp}_{transition_value}.mp4"
-            
-            # Create the video with FFmpeg
-            self._generate_video(
-                image_sequence, 
-                audio_file, 
-                subtitle_file, 
-                output_file, 
-                duration_value, 
-                fps_value, 
-                add_music_value,
-                background_music
-            )
+            # Intermediate files live in a temporary directory that is removed even on failure
+            with tempfile.TemporaryDirectory() as temp_name:
+                temp_dir = Path(temp_name)
+                
+                # Music and subtitles are disk work, so prepare them while the sequence is assembled
+                pending = {}
+                
+                # Select background music if requested
+                if add_music_value and not audio_file:
+                    pending["music"] = loop.run_in_executor(None, self._select_background_music, music_genre)
+                
+                # Create subtitles if text is provided
+                if tamil_text or english_text:
+                    pending["subtitles"] = loop.run_in_executor(
+                        None, self._create_subtitles, tamil_text, english_text, duration_value, temp_dir
+                    )
+                
+                # Create image sequence with transitions
+                image_sequence = self._create_image_sequence_with_transitions(
+                    valid_images, 
+                    duration_value, 
+                    transition_value,
+                    apply_effects_value,
+                    temp_dir
+                )
+                
+                # Zoom and pan effects are the slowest part of the graph, so reuse earlier renders
+                if self.cache_effect_clips:
+                    image_sequence = await self._prerender_effect_clips(image_sequence, fps_value, quality_value)
+                
+                prepared = dict(zip(pending, await asyncio.gather(*pending.values())))
+                background_music = prepared.get("music")
+                subtitle_file = prepared.get("subtitles")
+                
+                # Generate the video, named after its inputs so identical requests share a file
+                video_id = await loop.run_in_executor(
+                    None, self._video_id, [img["file_path"] for img in valid_images], audio_file, settings
+                )
+                output_file = self.output_dir / f"valluvar_story_{video_id}_{transition_value}.mp4"
+                
+                # Create the video with FFmpeg; a single still needs no filtergraph at all
+                if len(image_sequence) == 1 and not (image_sequence[0]["filters"] or image_sequence[0].get("prerendered")):
+                    await self._generate_still_video(
+                        image_sequence[0]["file_path"],
+                        audio_file,
+                        subtitle_file,
+                        output_file,
+                        duration_value,
+                        fps_value,
+                        add_music_value,
+                        background_music,
+                        quality_value,
+                        streaming
+                    )
+                else:
+                    await self._generate_video(
+                        image_sequence, 
+                        audio_file, 
+                        subtitle_file, 
+                        output_file, 
+                        duration_value, 
+                        fps_value, 
+                        add_music_value,
+                        temp_dir,
+                        background_music,
+                        quality_value,
+                        streaming
+                    )
             
             result = {
                 "success": True,
@@ -230,12 +539,14 @@ class VideoBuilder:
                 "has_audio": audio_file is not None or background_music is not None,
                 "has_subtitles": subtitle_file is not None,
                 "transition": transition_value,
-                "effects_applied": apply_effects_value
+                "effects_applied": apply_effects_value,
+                "output_quality": quality_value,
+                "streaming": streaming
             }
             
             # Cache the result if requested
             if cache_result:
-                cache.set("videos", cache_key, result)
+                get_cache().set("videos", cache_key, result)
             
             return result
             
@@ -247,43 +558,136 @@ class VideoBuilder:
                 "file_path": None
             }
     
-    def _select_background_music(self, genre: Optional[str], temp_dir: Path) -> Optional[str]:
+    @staticmethod
+    def _file_identity(file_path: Optional[str]) -> List[Any]:
+        """
+        Identify a file by its path, modification time and size, so edits invalidate cached videos.
+        
+        Args:
+            file_path: Path to the file.
+            
+        Returns:
+            List of [path, mtime in nanoseconds, size], with None for a missing file
+            or an empty path.
+        """
+        if not file_path:
+            # Failed narration or image generation leaves no file
+            return [file_path, None, None]
+        try:
+            stat = os.stat(file_path)
+        except (OSError, ValueError):
+            return [file_path, None, None]
+        return [file_path, stat.st_mtime_ns, stat.st_size]
+    
+    @staticmethod
+    def _cache_key(key_data: Dict[str, Any]) -> str:
+        """
+        Digest a video request into a compact, order-independent cache key.
+        
+        Args:
+            key_data: JSON-serializable description of the request.
+            
+        Returns:
+            SHA-256 hex digest of the canonical JSON encoding.
+        """
+        blob = json.dumps(key_data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+    
+    def create_videos_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several videos concurrently.
+
+        FFmpeg already uses several threads per encode but stalls on filtergraph work, so
+        running a few encodes side by side keeps the cores busy.
+
+        Args:
+            requests: List of keyword arguments for create_video, one per video.
+
+        Returns:
+            List of dictionaries with video information, in the same order as the requests.
+        """
+        max_workers = max(1, (os.cpu_count() or 1) // 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda request: self.create_video(**request), requests))
+    
+    @staticmethod
+    def _existing_paths(paths: Iterable[Optional[str]]) -> Set[str]:
+        """
+        Find which of the given paths exist, listing each parent directory once.
+
+        Args:
+            paths: Paths to look up; empty entries are ignored.
+
+        Returns:
+            The subset of the given paths that exist.
+        """
+        by_dir: Dict[str, Dict[str, List[str]]] = {}
+        for path in paths:
+            if path:
+                parent, name = os.path.split(os.path.abspath(path))
+                by_dir.setdefault(parent, {}).setdefault(name, []).append(path)
+
+        existing = set()
+        for parent, names in by_dir.items():
+            try:
+                with os.scandir(parent) as entries:
+                    for entry in entries:
+                        if entry.name in names:
+                            existing.update(names[entry.name])
+            except OSError:
+                continue
+        return existing
+    
+    def _index_music(self) -> Tuple[List[Path], Dict[str, List[Path]]]:
+        """
+        List the background music files once, grouped by the genres named in their file names.
+        
+        Returns:
+            Tuple of (all music files, music files for each genre in MUSIC_GENRES).
+        """
+        music_all = []
+        music_by_genre = {genre: [] for genre in self.MUSIC_GENRES}
+        with os.scandir(self.music_dir) as entries:
+            for entry in entries:
+                name = entry.name.lower()
+                if not name.endswith(('.mp3', '.wav', '.ogg')):
+                    continue
+                path = Path(entry.path)
+                music_all.append(path)
+                for genre in self.MUSIC_GENRES:
+                    if genre in name:
+                        music_by_genre[genre].append(path)
+        return music_all, music_by_genre
+    
+    def _select_background_music(self, genre: Optional[str]) -> Optional[str]:
         """
         Select background music based on the genre.
         
         Args:
             genre: The genre of music to select. If None, selects randomly.
-            temp_dir: Temporary directory for intermediate files.
             
         Returns:
             Path to the selected music file, or None if no music is available.
         """
-        # Check if we have any music files
-        if not os.path.exists(self.music_dir):
-            return None
-        
-        # Get all music files
-        music_files = []
-        for ext in ['.mp3', '.wav', '.ogg']:
-            music_files.extend(list(self.music_dir.glob(f"*{ext}")))
-        
-        if not music_files:
+        if not self._music_all:
             return None
         
         # If genre is specified, filter by genre
+        music_files = self._music_all
         if genre:
-            genre_files = [f for f in music_files if genre.lower() in f.name.lower()]
+            genre = genre.lower()
+            if genre in self._music_by_genre:
+                genre_files = self._music_by_genre[genre]
+            else:
+                genre_files = [f for f in self._music_all if genre in f.name.lower()]
             if genre_files:
                 music_files = genre_files
         
         # Select a random music file
         selected_music = random.choice(music_files)
         
-        # Copy to temp directory to avoid permission issues
-        temp_music = temp_dir / selected_music.name
-        shutil.copy(selected_music, temp_music)
-        
-        return str(temp_music)
+        # FFmpeg only reads the file, so it can use it where it is
+        return str(selected_music)
     
     def _create_image_sequence_with_transitions(self, 
                                               images: List[Dict[str, Any]], 
@@ -308,13 +712,13 @@ class VideoBuilder:
         num_images = len(images)
         image_duration = duration / num_images
         
+        # Get the transition filter
+        transition_filter = self.TRANSITIONS.get(transition) or self.TRANSITIONS['crossfade']
+        
         # Create the sequence
         sequence = []
         
         for i, img in enumerate(images):
-            # Get the transition filter
-            transition_filter = self.TRANSITIONS.get(transition, self.TRANSITIONS['crossfade'])
-            
             # Apply effects if requested
             filters = []
             if apply_effects:
@@ -325,14 +729,19 @@ class VideoBuilder:
                     filters.append(self.TRANSITIONS['kenburns'])
                 # Otherwise, no additional effects
             
-            # Add the transition filter
+            # Add the transition filter; xfade joins this image to the previous one
+            join = None
             if i > 0:  # Don't add transition for the first image
-                filters.append(transition_filter)
+                if transition_filter.startswith("xfade"):
+                    join = transition_filter
+                else:
+                    filters.append(transition_filter)
             
             sequence.append({
                 "file_path": img["file_path"],
                 "duration": image_duration,
-                "filters": filters
+                "filters": filters,
+                "transition": join
             })
         
         return sequence
@@ -350,34 +759,6 @@ class VideoBuilder:
         except (subprocess.SubprocessError, FileNotFoundError):
             return False
     
-    def _create_image_sequence(
-        self,
-        images: List[Dict[str, Any]],
-        duration: int,
-        temp_dir: Path
-    ) -> List[Tuple[str, float]]:
-        """
-        Create a sequence of images with durations for the video.
-        
-        Args:
-            images: List of dictionaries with image information.
-            duration: Target duration of the video in seconds.
-            temp_dir: Temporary directory for intermediate files.
-            
-        Returns:
-            List of tuples with (image_path, duration_in_seconds).
-        """
-        # Calculate duration for each image
-        num_images = len(images)
-        image_duration = duration / num_images
-        
-        # Create the sequence
-        sequence = []
-        for img in images:
-            sequence.append((img["file_path"], image_duration))
-        
-        return sequence
-    
     def _create_subtitles(
         self,
         tamil_text: Optional[str],
@@ -403,69 +784,316 @@ class VideoBuilder:
         # Create a subtitle file
         subtitle_file = temp_dir / "subtitles.srt"
         
-        with open(subtitle_file, "w", encoding="utf-8") as f:
-            subtitle_index = 1
-            
-            # Add Tamil subtitles
-            if tamil_text:
-                # Split the text into sentences
-                sentences = tamil_text.split(".")
-                sentences = [s.strip() for s in sentences if s.strip()]
-                
-                # Calculate time per sentence
-                time_per_sentence = duration / (len(sentences) + (1 if english_text else 0))
-                
-                for i, sentence in enumerate(sentences):
-                    start_time = i * time_per_sentence
-                    end_time = (i + 1) * time_per_sentence
-                    
-                    f.write(f"{subtitle_index}\n")
-                    f.write(f"{self._format_time(start_time)} --> {self._format_time(end_time)}\n")
-                    f.write(f"{sentence}\n\n")
-                    
-                    subtitle_index += 1
+        # Split the texts into sentences
+        tamil_sentences = [s.strip() for s in tamil_text.split(".") if s.strip()] if tamil_text else []
+        english_sentences = [s.strip() for s in english_text.split(".") if s.strip()] if english_text else []
+        
+        lines = []
+        
+        # Add Tamil subtitles
+        if tamil_sentences:
+            # Calculate time per sentence
+            time_per_sentence = duration / (len(tamil_sentences) + (1 if english_text else 0))
+            lines.extend(self._subtitle_entries(tamil_sentences, 0, time_per_sentence, 1))
+        
+        # Add English subtitles
+        if english_sentences:
+            # Calculate time per sentence
+            time_per_sentence = duration / (len(english_sentences) + (1 if tamil_text else 0))
             
-            # Add English subtitles
-            if english_text:
-                # Split the text into sentences
-                sentences = english_text.split(".")
-                sentences = [s.strip() for s in sentences if s.strip()]
-                
-                # Calculate time per sentence
-                time_per_sentence = duration / (len(sentences) + (1 if tamil_text else 0))
-                
-                # Start after Tamil subtitles if present
-                start_offset = len(tamil_text.split(".")) * time_per_sentence if tamil_text else 0
-                
-                for i, sentence in enumerate(sentences):
-                    start_time = start_offset + i * time_per_sentence
-                    end_time = start_offset + (i + 1) * time_per_sentence
-                    
-                    f.write(f"{subtitle_index}\n")
-                    f.write(f"{self._format_time(start_time)} --> {self._format_time(end_time)}\n")
-                    f.write(f"{sentence}\n\n")
-                    
-                    subtitle_index += 1
+            # Start after Tamil subtitles if present
+            start_offset = len(tamil_sentences) * time_per_sentence
+            lines.extend(self._subtitle_entries(
+                english_sentences, start_offset, time_per_sentence, len(tamil_sentences) + 1
+            ))
+        
+        with open(subtitle_file, "w", encoding="utf-8") as f:
+            f.writelines(lines)
         
         return str(subtitle_file)
     
-    def _format_time(self, seconds: float) -> str:
+    def _subtitle_entries(
+        self,
+        sentences: List[str],
+        start_offset: float,
+        time_per_sentence: float,
+        first_index: int
+    ) -> List[str]:
+        """
+        Build the SRT entries for consecutive, equally long sentences.
+        
+        Args:
+            sentences: Sentences to show, in order.
+            start_offset: Start time of the first sentence in seconds.
+            time_per_sentence: How long each sentence is shown in seconds.
+            first_index: SRT index of the first sentence.
+            
+        Returns:
+            List of SRT entries, one per sentence.
+        """
+        starts = start_offset + np.arange(len(sentences)) * time_per_sentence
+        start_times = self._format_times(starts)
+        end_times = self._format_times(starts + time_per_sentence)
+        
+        return [
+            f"{index}\n{start} --> {end}\n{sentence}\n\n"
+            for index, sentence, start, end in zip(
+                range(first_index, first_index + len(sentences)), sentences, start_times, end_times
+            )
+        ]
+    
+    @staticmethod
+    def _format_times(seconds: "np.ndarray") -> List[str]:
         """
-        Format time in SRT format (HH:MM:SS,mmm).
+        Format times in SRT format (HH:MM:SS,mmm).
         
         Args:
-            seconds: Time in seconds.
+            seconds: Times in seconds.
             
         Returns:
-            Formatted time string.
+            Formatted time strings.
         """
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        milliseconds = int((seconds - int(seconds)) * 1000)
+        total_ms = np.rint(seconds * 1000).astype(np.int64)
+        hours = total_ms // 3_600_000
+        minutes = total_ms // 60_000 % 60
+        secs = total_ms // 1000 % 60
+        milliseconds = total_ms % 1000
         
-        return f"{hours:02d}:{minutes:02d}:{int(seconds):02d},{milliseconds:03d}"
+        return [
+            f"{h:02d}:{m:02d}:{s:02d},{ms:03d}"
+            for h, m, s, ms in zip(hours.tolist(), minutes.tolist(), secs.tolist(), milliseconds.tolist())
+        ]
     
-    def _generate_video(
+    @staticmethod
+    def _has_xfade(image_sequence: List[Dict[str, Any]]) -> bool:
+        """Whether the images are joined with xfade transitions rather than cut together."""
+        return any(img_info.get("transition") for img_info in image_sequence)
+
+    def _clip_lengths(self, image_sequence: List[Dict[str, Any]]) -> List[float]:
+        """Length of each image's clip; longer than its slot when it overlaps the next image in an xfade."""
+        overlap = _XFADE_DURATION if self._has_xfade(image_sequence) else 0
+        return [img_info["duration"] + overlap for img_info in image_sequence]
+
+    def _image_filters(self, img_info: Dict[str, Any], length: float, fps: int) -> List[str]:
+        """
+        Filters bringing one image to the common size, rate and format, with its effects applied.
+
+        Args:
+            img_info: Dictionary with image sequence information.
+            length: Length of the image's clip in seconds.
+            fps: Frames per second for the video.
+
+        Returns:
+            List of filters to chain for the image.
+        """
+        # A pre-rendered clip already has its size and effects
+        if img_info.get("prerendered"):
+            return ["setsar=1", f"fps={fps}", f"trim=duration={length:.3f}", "format=yuv420p"]
+
+        width, height = _FRAME_SIZE
+        chain = [
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            "setsar=1"
+        ]
+        for filter_str in img_info.get("filters", []):
+            # Replace placeholders in filter string
+            filter_str = filter_str.replace("{duration-1}", str(img_info["duration"] - 1))
+            # zoompan emits 25 fps unless told otherwise, which fps= would then resample
+            if filter_str.startswith("zoompan"):
+                filter_str += f":fps={fps}"
+            chain.append(filter_str)
+        # Still images are read at one frame a second, so repeat them up to the
+        # output rate and cut the clip back to its exact length
+        chain.extend([f"fps={fps}", f"trim=duration={length:.3f}", "format=yuv420p"])
+        return chain
+
+    @staticmethod
+    def _image_input_args(img_info: Dict[str, Any], length: float, fps: int) -> List[str]:
+        """
+        FFmpeg input arguments looping one image for the length of its clip.
+
+        The input rate is pinned so FFmpeg never guesses one. An image with effects
+        changes every frame, so it is read at the output rate; otherwise it is read
+        once a second.
+
+        Args:
+            img_info: Dictionary with image sequence information.
+            length: Length of the image's clip in seconds.
+            fps: Frames per second for the video.
+
+        Returns:
+            List of input arguments.
+        """
+        rate = fps if img_info.get("filters") else 1
+        return ["-framerate", str(rate), "-loop", "1", "-t", str(length), "-i", img_info["file_path"]]
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """SHA-256 digest of a file's contents, recomputed only when the file changes."""
+        stat = os.stat(file_path)
+        return _file_sha256(file_path, stat.st_mtime_ns, stat.st_size)
+
+    def _video_id(self, image_paths: List[str], audio_file: Optional[str], settings: Dict[str, Any]) -> str:
+        """
+        Short stable ID for an output video, derived from its inputs rather than when they were made.
+
+        Args:
+            image_paths: Paths to the images in the video.
+            audio_file: Path to the narration, if any.
+            settings: JSON-serializable request settings.
+
+        Returns:
+            16-character hex digest.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        for path in image_paths + ([audio_file] if audio_file else []):
+            digest.update(bytes.fromhex(self._hash_file(path)))
+        digest.update(json.dumps(settings, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    async def _render_image_clip(
+        self,
+        img_info: Dict[str, Any],
+        length: float,
+        fps: int,
+        quality: str = "standard"
+    ) -> Path:
+        """
+        Render one image with its effects to a clip, reusing an earlier render of the same clip.
+
+        Clips are stored under the output directory, keyed by the image contents, the
+        filters applied to it, the frame rate, the clip length and the quality tier.
+
+        Args:
+            img_info: Dictionary with image sequence information.
+            length: Length of the clip in seconds.
+            fps: Frames per second for the video.
+            quality: Encoder speed/quality tier.
+
+        Returns:
+            Path to the rendered clip.
+        """
+        loop = asyncio.get_running_loop()
+        chain = self._image_filters(img_info, length, fps)
+        image_hash = await loop.run_in_executor(None, self._hash_file, img_info["file_path"])
+        key = hashlib.sha256(f"{image_hash}|{','.join(chain)}|{length:.3f}|{quality}".encode("utf-8")).hexdigest()
+
+        clip_dir = self.output_dir / _CLIP_CACHE_DIR
+        clip_file = clip_dir / f"{key}.mp4"
+        if clip_file.exists():
+            return clip_file
+
+        os.makedirs(clip_dir, exist_ok=True)
+        # Render under a unique name so concurrent builds never see a partial clip
+        fd, partial = tempfile.mkstemp(prefix=f"{key}.", suffix=".mp4", dir=clip_dir)
+        os.close(fd)
+
+        if self._hw_encoder == "h264_vaapi":
+            chain.append(_VAAPI_UPLOAD)
+        cmd = [
+            "ffmpeg",
+            "-y",
+            *_FILTER_THREAD_ARGS,
+            *self._hw_input_args,
+            *self._image_input_args(img_info, length, fps),
+            "-vf", ",".join(chain),
+            "-r", str(fps), "-c:v", self._hw_encoder, *self._hw_output_args,
+            *_quality_args(self._hw_encoder, quality),
+            "-threads", "0",
+            "-an",
+            partial
+        ]
+        try:
+            await self._run_ffmpeg(cmd)
+            os.replace(partial, clip_file)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+        return clip_file
+
+    async def _prerender_effect_clips(
+        self,
+        image_sequence: List[Dict[str, Any]],
+        fps: int,
+        quality: str = "standard"
+    ) -> List[Dict[str, Any]]:
+        """
+        Replace the images that have effects with cached clips of those effects.
+
+        Args:
+            image_sequence: List of dictionaries with image sequence information.
+            fps: Frames per second for the video.
+            quality: Encoder speed/quality tier.
+
+        Returns:
+            The image sequence, with effect images pointing at their pre-rendered clips.
+        """
+        renders = {
+            i: self._render_image_clip(img_info, length, fps, quality)
+            for i, (img_info, length) in enumerate(zip(image_sequence, self._clip_lengths(image_sequence)))
+            if img_info.get("filters")
+        }
+        clips = dict(zip(renders, await asyncio.gather(*renders.values())))
+
+        return [
+            dict(img_info, file_path=str(clips[i]), filters=[], prerendered=True) if i in clips else img_info
+            for i, img_info in enumerate(image_sequence)
+        ]
+
+    def _build_filter_graph(
+        self,
+        image_sequence: List[Dict[str, Any]],
+        subtitle_file: Optional[str],
+        fps: int
+    ) -> str:
+        """
+        Build the filtergraph joining the looped image inputs into a single video stream.
+
+        Args:
+            image_sequence: List of dictionaries with image sequence information.
+            subtitle_file: Path to the subtitle file.
+            fps: Frames per second for the video.
+
+        Returns:
+            Filtergraph whose output pad is labelled [vout].
+        """
+        graph = []
+
+        # Bring every image to the same size, rate and format, which xfade requires
+        for i, (img_info, length) in enumerate(zip(image_sequence, self._clip_lengths(image_sequence))):
+            chain = self._image_filters(img_info, length, fps)
+            graph.append(f"[{i}:v]{','.join(chain)}[v{i}]")
+
+        # Join the images, cross-fading with cumulative offsets or simply cutting
+        if self._has_xfade(image_sequence):
+            previous = "v0"
+            offset = 0.0
+            for i, img_info in enumerate(image_sequence[1:], start=1):
+                offset += image_sequence[i - 1]["duration"]
+                graph.append(f"[{previous}][v{i}]{img_info['transition']}:offset={offset:.3f}[x{i}]")
+                previous = f"x{i}"
+        elif len(image_sequence) > 1:
+            inputs = "".join(f"[v{i}]" for i in range(len(image_sequence)))
+            graph.append(f"{inputs}concat=n={len(image_sequence)}:v=1:a=0[joined]")
+            previous = "joined"
+        else:
+            previous = "v0"
+
+        # Add subtitles if available
+        video_filters = []
+        if subtitle_file:
+            video_filters.append(f"subtitles={subtitle_file}:force_style='{self.subtitle_style}'")
+
+        # VAAPI encodes from GPU surfaces, so upload the frames last
+        if self._hw_encoder == "h264_vaapi":
+            video_filters.append(_VAAPI_UPLOAD)
+
+        graph.append(f"[{previous}]{','.join(video_filters) or 'null'}[vout]")
+        return ";".join(graph)
+
+    async def _generate_video(
         self,
         image_sequence: List[Dict[str, Any]],
         audio_file: Optional[str],
@@ -474,116 +1102,528 @@ class VideoBuilder:
         duration: int,
         fps: int,
         add_music: bool,
-        background_music: Optional[str] = None
+        temp_dir: Path,
+        background_music: Optional[str] = None,
+        output_quality: str = "standard",
+        streaming: bool = False
     ) -> None:
         """
         Generate the video using FFmpeg with enhanced transitions and effects.
         
         Args:
             image_sequence: List of dictionaries with image sequence information.
-            audio_file: Path to the audio file.
-            subtitle_file: Path to the subtitle file.
+            audio_file: Path to the audio file, already known to exist.
+            subtitle_file: Path to the subtitle file, already known to exist.
             output_file: Path to the output video file.
             duration: Target duration of the video in seconds.
             fps: Frames per second for the video.
             add_music: Whether to add background music.
+            temp_dir: Temporary directory for intermediate files.
             background_music: Path to the background music file. If None and add_music is True,
                 a default music file will be used.
+            output_quality: Encoder speed/quality tier: 'preview', 'standard' or 'archive'.
+            streaming: Whether to write a fragmented MP4 for live streaming.
         """
-        # Create a temporary file for the FFmpeg input
-        temp_dir = Path(tempfile.mkdtemp())
-        input_file = temp_dir / "input.txt"
-        filter_file = temp_dir / "filters.txt"
+        audio_input = self._audio_input_args(audio_file, add_music, background_music)
+
+        # Clips that need no further filtering are joined without re-encoding
+        if self._can_copy_clips(image_sequence, subtitle_file):
+            await self._concat_clips(image_sequence, audio_input, output_file, temp_dir, streaming)
+            return
+
+        # Filter and encode in-process rather than starting FFmpeg. PyAV's bundled
+        # FFmpeg is often built without libass, so subtitles may still need the CLI
+        if self.use_pyav and (not subtitle_file or "subtitles" in av.filter.filters_available):
+            music = background_music if add_music and not audio_file else None
+            await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._generate_video_pyav,
+                image_sequence,
+                audio_file or music,
+                audio_input is not None,
+                subtitle_file,
+                output_file,
+                fps,
+                output_quality,
+                streaming
+            )
+            return
+
+        # Each image is its own looped input
+        cmd = [
+            "ffmpeg",
+            "-y",  # Overwrite output file if it exists
+            *_FILTER_THREAD_ARGS,
+            *self._hw_input_args
+        ]
+        for img_info, length in zip(image_sequence, self._clip_lengths(image_sequence)):
+            if img_info.get("prerendered"):
+                cmd.extend(["-i", img_info["file_path"]])
+                continue
+            cmd.extend(self._image_input_args(img_info, length, fps))
+
+        if audio_input:
+            cmd.extend(audio_input)
+
+        # Transitions, effects and subtitles all run in one filtergraph
+        filter_complex = self._build_filter_graph(image_sequence, subtitle_file, fps)
+        if len(filter_complex) > _INLINE_GRAPH_MAX_CHARS:
+            # Keep very long graphs off the command line
+            filter_file = temp_dir / "filters.txt"
+            with open(filter_file, "w", encoding="utf-8") as f:
+                f.write(filter_complex)
+            cmd.extend(["-filter_complex_script", str(filter_file)])
+        else:
+            cmd.extend(["-filter_complex", filter_complex])
+
+        cmd.extend(["-map", "[vout]", "-r", str(fps), "-c:v", self._hw_encoder] + self._hw_output_args)
+        cmd.extend(_quality_args(self._hw_encoder, output_quality))
+        cmd.extend(["-threads", "0"])
+
+        # A slideshow without motion is a sequence of stills
+        if self._hw_encoder == "libx264" and not any(
+            img_info.get("filters") or img_info.get("prerendered") or img_info.get("transition")
+            for img_info in image_sequence
+        ):
+            cmd.extend(["-tune", "stillimage"])
+
+        if audio_input:
+            cmd.extend([
+                "-map", f"{len(image_sequence)}:a",
+                "-c:a", "aac",
+                "-b:a", "192k",
+                "-shortest"
+            ])
+
+        # Output file
+        cmd.extend(self._movflags_args(streaming))
+        cmd.append(str(output_file))
         
-        # Prepare filter complex for transitions and effects
-        filter_complex = []
+        # Run FFmpeg
+        await self._run_ffmpeg(cmd)
+    
+    @staticmethod
+    def _movflags_args(streaming: bool) -> List[str]:
+        """MP4 muxer flags: fragmented for live streaming, otherwise the index moved up front."""
+        return ["-movflags", _MOVFLAGS_STREAMING if streaming else _MOVFLAGS_FASTSTART]
+
+    @staticmethod
+    def _audio_input_args(
+        audio_file: Optional[str],
+        add_music: bool,
+        background_music: Optional[str]
+    ) -> Optional[List[str]]:
+        """
+        FFmpeg input arguments for the audio track.
         
-        # Write the input file for FFmpeg and prepare filters
-        with open(input_file, "w", encoding="utf-8") as f:
-            for i, img_info in enumerate(image_sequence):
-                img_path = img_info["file_path"]
-                img_duration = img_info["duration"]
-                filters = img_info.get("filters", [])
-                
-                f.write(f"file '{img_path}'\n")
-                f.write(f"duration {img_duration}\n")
-                
-                # Add filters to filter complex if any
-                if filters:
-                    for filter_str in filters:
-                        # Replace placeholders in filter string
-                        filter_str = filter_str.replace("{duration-1}", str(img_duration-1))
-                        filter_complex.append(f"[{i}:v]{filter_str}[v{i}]")
+        Args:
+            audio_file: Path to the narration, already known to exist.
+            add_music: Whether to add background music.
+            background_music: Path to the background music file.
             
-            # Add the last image again without duration to avoid cutting it off
-            last_img_path = image_sequence[-1]["file_path"]
-            f.write(f"file '{last_img_path}'\n")
+        Returns:
+            List of input arguments, or None if the video has no audio.
+        """
+        # Add audio if available
+        if audio_file:
+            return ["-i", audio_file]
+
+        # Add background music if requested
+        if add_music:
+            if background_music:
+                return ["-i", background_music]
+            # Use a placeholder for background music if no file is available
+            return ["-f", "lavfi", "-i", "anullsrc=r=44100:cl=stereo"]
+
+        return None
+
+    async def _generate_still_video(
+        self,
+        image_path: str,
+        audio_file: Optional[str],
+        subtitle_file: Optional[str],
+        output_file: Path,
+        duration: int,
+        fps: int,
+        add_music: bool,
+        background_music: Optional[str] = None,
+        output_quality: str = "standard",
+        streaming: bool = False
+    ) -> None:
+        """
+        Generate a video showing a single still image for its whole length.
         
-        # Write filter complex to file if needed
-        if filter_complex:
-            with open(filter_file, "w", encoding="utf-8") as f:
-                f.write(";".join(filter_complex))
+        The image is decoded and scaled once a second, and since no frame differs from
+        the previous one the encoder runs at its fastest preset with almost no quality loss.
         
-        # Base FFmpeg command
+        Args:
+            image_path: Path to the image.
+            audio_file: Path to the audio file, already known to exist.
+            subtitle_file: Path to the subtitle file, already known to exist.
+            output_file: Path to the output video file.
+            duration: Target duration of the video in seconds.
+            fps: Frames per second for the video.
+            add_music: Whether to add background music.
+            background_music: Path to the background music file. If None and add_music is True,
+                silence is used.
+            output_quality: Encoder speed/quality tier: 'preview', 'standard' or 'archive'.
+            streaming: Whether to write a fragmented MP4 for live streaming.
+        """
+        width, height = _FRAME_SIZE
+        video_filters = [
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease",
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            "setsar=1",
+            f"fps={fps}",
+            f"trim=duration={duration:.3f}",
+            "format=yuv420p"
+        ]
+        if subtitle_file:
+            video_filters.append(f"subtitles={subtitle_file}:force_style='{self.subtitle_style}'")
+        if self._hw_encoder == "h264_vaapi":
+            video_filters.append(_VAAPI_UPLOAD)
+
         cmd = [
             "ffmpeg",
-            "-y",  # Overwrite output file if it exists
-            "-f", "concat",
-            "-safe", "0",
-            "-i", str(input_file),
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",
-            "-r", str(fps),
-            "-preset", "medium",
-            "-crf", "23"
+            "-y",
+            *self._hw_input_args,
+            "-framerate", "1", "-loop", "1", "-t", str(duration), "-i", image_path
         ]
-        
-        # Add filter complex if available
-        if filter_complex:
+        audio_input = self._audio_input_args(audio_file, add_music, background_music)
+        if audio_input:
+            cmd.extend(audio_input)
+
+        cmd.extend(["-vf", ",".join(video_filters), "-r", str(fps), "-c:v", self._hw_encoder])
+        cmd.extend(self._hw_output_args)
+        cmd.extend(_quality_args(self._hw_encoder, output_quality))
+        cmd.extend(_still_args(self._hw_encoder, output_quality))
+        cmd.extend(["-threads", "0"])
+
+        if audio_input:
             cmd.extend([
-                "-filter_complex_script", str(filter_file)
+                "-map", "0:v",
+                "-map", "1:a",
+                "-c:a", "aac",
+                "-b:a", "192k",
+                "-shortest"
             ])
-        
-        # Add audio if available
-        if audio_file and os.path.exists(audio_file):
+
+        cmd.extend(self._movflags_args(streaming))
+        cmd.append(str(output_file))
+        await self._run_ffmpeg(cmd)
+
+    def _can_copy_clips(self, image_sequence: List[Dict[str, Any]], subtitle_file: Optional[str]) -> bool:
+        """
+        Whether the video can be assembled by stream-copying pre-rendered clips.
+
+        Every image must already be a clip, and nothing may need to change their frames:
+        no xfade transitions and no burned-in subtitles.
+        """
+        if not all(img_info.get("prerendered") for img_info in image_sequence):
+            return False
+        if self._has_xfade(image_sequence):
+            return False
+        return not subtitle_file
+
+    async def _concat_clips(
+        self,
+        image_sequence: List[Dict[str, Any]],
+        audio_input: Optional[List[str]],
+        output_file: Path,
+        temp_dir: Path,
+        streaming: bool = False
+    ) -> None:
+        """
+        Join pre-rendered clips with the concat demuxer, copying the video stream as is.
+
+        The clips all come from the same encoder and settings, so they can be joined
+        without decoding them.
+
+        Args:
+            image_sequence: List of dictionaries with pre-rendered clip information.
+            audio_input: FFmpeg input arguments for the audio track, if any.
+            output_file: Path to the output video file.
+            temp_dir: Temporary directory for intermediate files.
+            streaming: Whether to write a fragmented MP4 for live streaming.
+        """
+        concat_file = temp_dir / "concat.txt"
+        with open(concat_file, "w", encoding="utf-8") as f:
+            for img_info in image_sequence:
+                escaped = img_info["file_path"].replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", str(concat_file)]
+        if audio_input:
+            cmd.extend(audio_input)
+        cmd.extend(["-map", "0:v", "-c:v", "copy"])
+        if audio_input:
             cmd.extend([
-                "-i", audio_file,
+                "-map", "1:a",
                 "-c:a", "aac",
                 "-b:a", "192k",
                 "-shortest"
             ])
+        cmd.extend(self._movflags_args(streaming))
+        cmd.append(str(output_file))
+
+        await self._run_ffmpeg(cmd)
+
+    @staticmethod
+    def _pyav_frames(img_info: Dict[str, Any], length: float, fps: int) -> Tuple["av.VideoFrame", Iterator["av.VideoFrame"], int]:
+        """
+        Decode the frames PyAV feeds into the filtergraph for one image.
+
+        Like _image_input_args, a still image is repeated at one frame a second unless it
+        has effects, while a pre-rendered clip is decoded frame by frame.
+
+        Args:
+            img_info: Dictionary with image sequence information.
+            length: Length of the image's clip in seconds.
+            fps: Frames per second for the video.
+
+        Returns:
+            Tuple of (first frame, iterator over all frames, frame rate).
+        """
+        if img_info.get("prerendered"):
+            def decode_clip() -> Iterator["av.VideoFrame"]:
+                with av.open(img_info["file_path"]) as container:
+                    yield from container.decode(video=0)
+
+            frames = decode_clip()
+            first = next(frames)
+            return first, itertools.chain([first], frames), fps
+
+        with av.open(img_info["file_path"]) as container:
+            first = next(container.decode(video=0))
+        rate = fps if img_info.get("filters") else 1
+        return first, itertools.repeat(first, math.ceil(length * rate)), rate
+
+    @staticmethod
+    def _pyav_add_filter(graph: "av.filter.Graph", upstream: Any, filter_str: str) -> Any:
+        """Add a filter chain given as "name=args,..." to the graph and link it after upstream."""
+        node = upstream
+        # Commas inside quoted expressions don't separate filters
+        for part in _FILTER_SPLIT.findall(filter_str):
+            name, _, args = part.partition("=")
+            added = graph.add(name, args or None)
+            node.link_to(added)
+            node = added
+        return node
+
+    def _generate_video_pyav(
+        self,
+        image_sequence: List[Dict[str, Any]],
+        audio_file: Optional[str],
+        has_audio: bool,
+        subtitle_file: Optional[str],
+        output_file: Path,
+        fps: int,
+        output_quality: str = "standard",
+        streaming: bool = False
+    ) -> None:
+        """
+        Generate the video in-process with PyAV instead of an FFmpeg subprocess.
+
+        Builds the same graph as _build_filter_graph, feeds it the images in timeline
+        order and encodes on a separate thread, so filtering and encoding overlap.
+        PyAV releases the GIL while it filters and encodes.
+
+        Args:
+            image_sequence: List of dictionaries with image sequence information.
+            audio_file: Path to the narration or background music, already known to exist.
+            has_audio: Whether to add an audio track; silent if there is no audio file.
+            subtitle_file: Path to the subtitle file, already known to exist.
+            output_file: Path to the output video file.
+            fps: Frames per second for the video.
+            output_quality: Encoder speed/quality tier: 'preview', 'standard' or 'archive'.
+            streaming: Whether to write a fragmented MP4 for live streaming.
+        """
+        # VAAPI needs frames uploaded to GPU surfaces, which PyAV doesn't do
+        encoder, output_args = self._hw_encoder, self._hw_output_args
+        if encoder == "h264_vaapi":
+            encoder, _, output_args = _SOFTWARE_ENCODER
+        output_args = [*output_args, *_quality_args(encoder, output_quality)]
+        options = {key.lstrip("-"): value for key, value in zip(output_args[::2], output_args[1::2])}
+        pix_fmt = options.pop("pix_fmt", "yuv420p")
+
+        # One buffer source per image, with the same per-image chain as the FFmpeg path
+        graph = av.filter.Graph()
+        sources, feeds, joined = [], [], []
+        start = 0.0
+        for i, (img_info, length) in enumerate(zip(image_sequence, self._clip_lengths(image_sequence))):
+            first, frames, rate = self._pyav_frames(img_info, length, fps)
+            source = graph.add_buffer(
+                width=first.width, height=first.height, format=first.format.name, time_base=Fraction(1, rate)
+            )
+            node = source
+            for filter_str in self._image_filters(img_info, length, fps):
+                node = self._pyav_add_filter(graph, node, filter_str)
+            sources.append(source)
+            joined.append(node)
+            feeds.append(self._pyav_timeline(i, start, frames, rate))
+            start += img_info["duration"]
+
+        # Join the images, cross-fading with cumulative offsets or simply cutting
+        if self._has_xfade(image_sequence):
+            node = joined[0]
+            offset = 0.0
+            for i, img_info in enumerate(image_sequence[1:], start=1):
+                offset += image_sequence[i - 1]["duration"]
+                xfade = self._pyav_add_filter(graph, node, f"{img_info['transition']}:offset={offset:.3f}")
+                joined[i].link_to(xfade, 0, 1)
+                node = xfade
+        elif len(joined) > 1:
+            node = graph.add("concat", f"n={len(joined)}:v=1:a=0")
+            for i, branch in enumerate(joined):
+                branch.link_to(node, 0, i)
+        else:
+            node = joined[0]
+
+        if subtitle_file:
+            node = self._pyav_add_filter(graph, node, f"subtitles={subtitle_file}:force_style='{self.subtitle_style}'")
+
+        sink = graph.add("buffersink")
+        node.link_to(sink)
+        graph.configure()
+
+        width, height = _FRAME_SIZE
+        time_base = Fraction(1, fps)
+        nvenc = encoder == "h264_nvenc"
+        if nvenc:
+            _NVENC_SESSIONS.acquire()
+        try:
+            movflags = _MOVFLAGS_STREAMING if streaming else _MOVFLAGS_FASTSTART
+            with av.open(str(output_file), mode="w", options={"movflags": movflags}) as output, ThreadPoolExecutor(max_workers=1) as encoding:
+                video = output.add_stream(encoder, rate=fps, options=options)
+                video.width, video.height, video.pix_fmt = width, height, pix_fmt
+                audio = output.add_stream("aac", rate=44100, layout="stereo") if has_audio else None
+                if audio:
+                    audio.bit_rate = 192000
+
+                # Frames are encoded in order on the worker while the graph makes the next ones
+                pending = collections.deque()
+                count = 0
+
+                def drain() -> None:
+                    nonlocal count
+                    while True:
+                        try:
+                            frame = sink.pull()
+                        except (BlockingIOError, EOFError):
+                            return
+                        if frame.format.name != pix_fmt:
+                            frame = frame.reformat(format=pix_fmt)
+                        frame.pts, frame.time_base = count, time_base
+                        count += 1
+                        pending.append(encoding.submit(lambda f=frame: output.mux(video.encode(f))))
+                        if len(pending) > _PYAV_ENCODE_QUEUE:
+                            pending.popleft().result()
+
+                # Push frames in timeline order so each join only buffers what it needs next
+                for _, i, k, frame in heapq.merge(*feeds):
+                    if frame is not None:
+                        frame.pts = k
+                    sources[i].push(frame)
+                    drain()
+                drain()
+
+                while pending:
+                    pending.popleft().result()
+                output.mux(video.encode(None))
+
+                if audio:
+                    self._pyav_mux_audio(output, audio, audio_file, count / fps)
+        finally:
+            if nvenc:
+                _NVENC_SESSIONS.release()
+
+    @staticmethod
+    def _pyav_timeline(index: int, start: float, frames: Iterator["av.VideoFrame"], rate: int) -> Iterator[Tuple[float, int, int, Optional["av.VideoFrame"]]]:
+        """
+        Tag one image's frames with their time on the video's timeline.
+
+        Yields (time, image index, frame number, frame), ending with a None frame that
+        signals the end of the image's input.
+        """
+        k = 0
+        for frame in frames:
+            yield start + k / rate, index, k, frame
+            k += 1
+        yield start + k / rate, index, k, None
+
+    @staticmethod
+    def _pyav_mux_audio(output: Any, stream: Any, audio_file: Optional[str], duration: float) -> None:
+        """
+        Encode the audio track, cut to the video's duration, or silence if there is no file.
+
+        Args:
+            output: PyAV output container.
+            stream: AAC stream of the output container.
+            audio_file: Path to the audio file, or None for silence.
+            duration: Length of the video in seconds.
+        """
+        total = int(duration * stream.rate)
+        written = 0
+
+        def mux(frame: "av.AudioFrame") -> None:
+            nonlocal written
+            frame.pts, frame.time_base = written, Fraction(1, stream.rate)
+            written += frame.samples
+            output.mux(stream.encode(frame))
+
+        if audio_file:
+            resampler = av.AudioResampler(format="fltp", layout="stereo", rate=stream.rate)
+            with av.open(audio_file) as source:
+                for frame in itertools.chain(source.decode(audio=0), [None]):
+                    for resampled in resampler.resample(frame):
+                        if written >= total:
+                            break
+                        mux(resampled)
+                    if written >= total:
+                        break
+        else:
+            silence = np.zeros((2, 1024), dtype=np.float32)
+            while written < total:
+                frame = av.AudioFrame.from_ndarray(silence, format="fltp", layout="stereo")
+                frame.sample_rate = stream.rate
+                mux(frame)
+
+        output.mux(stream.encode(None))
+
+    async def _run_ffmpeg(self, cmd: List[str]) -> None:
+        """
+        Run an FFmpeg command as an asyncio subprocess.
         
-        # Add background music if requested
-        elif add_music:
-            if background_music and os.path.exists(background_music):
-                cmd.extend([
-                    "-i", background_music,
-                    "-c:a", "aac",
-                    "-b:a", "192k",
-                    "-shortest"
-                ])
-            else:
-                # Use a placeholder for background music if no file is available
-                cmd.extend([
-                    "-f", "lavfi",
-                    "-i", "anullsrc=r=44100:cl=stereo",
-                    "-c:a", "aac",
-                    "-b:a", "192k",
-                    "-shortest"
-                ])
-        
-        # Add subtitles if available
-        if subtitle_file and os.path.exists(subtitle_file):
-            cmd.extend([
-                "-vf", f"subtitles={subtitle_file}:force_style='{self.subtitle_style}'"
-            ])
+        stderr is drained as it is written, keeping only its tail for error reports.
         
-        # Output file
-        cmd.append(str(output_file))
+        Args:
+            cmd: FFmpeg command line.
         
-        # Run FFmpeg
+        Raises:
+            subprocess.CalledProcessError: If FFmpeg exits with an error.
+        """
+        nvenc = "h264_nvenc" in cmd
+        if nvenc:
+            await asyncio.get_running_loop().run_in_executor(None, _NVENC_SESSIONS.acquire)
         try:
-            subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        except subprocess.CalledProcessError as e:
-            print(f"FFmpeg error: {e.stderr.decode() if e.stderr else str(e)}")
-            raise
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            tail = collections.deque(maxlen=2)
+            while True:
+                chunk = await process.stderr.read(_STDERR_TAIL_BYTES)
+                if not chunk:
+                    break
+                tail.append(chunk)
+            await process.wait()
+        finally:
+            if nvenc:
+                _NVENC_SESSIONS.release()
+        
+        if process.returncode != 0:
+            stderr = b"".join(tail)[-_STDERR_TAIL_BYTES:]
+            print(f"FFmpeg error: {stderr.decode(errors='replace')}")
+            raise subprocess.CalledProcessError(process.returncode, cmd, stderr=stderr)
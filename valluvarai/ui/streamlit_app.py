@@ -4,6 +4,7 @@ Streamlit UI for ValluvarAI.
 
 import os
 import sys
+import html
 import time
 from pathlib import Path
 
@@ -13,13 +14,21 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 try:
     import streamlit as st
     from PIL import Image
-    import base64
     STREAMLIT_AVAILABLE = True
 except ImportError:
     STREAMLIT_AVAILABLE = False
     print("Streamlit is not available. Please install it with 'pip install streamlit'.")
     sys.exit(1)
 
+try:
+    # SIMD-accelerated base64, noticeably faster on multi-megabyte payloads
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# Bytes read per base64 chunk (57 KiB, a multiple of 3)
+_B64_CHUNK_SIZE = 57 * 1024
+
 from valluvarai import KuralAgent
 
 # Set page configuration
@@ -79,10 +88,22 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'kural_agent' not in st.session_state:
-    st.session_state.kural_agent = KuralAgent()
+@st.cache_resource
+def get_agent():
+    """Create the KuralAgent once and share it across sessions and reruns."""
+    return KuralAgent()
+
+@st.cache_data(ttl=24 * 60 * 60, max_entries=128, show_spinner=False)
+def _cached_tell_story(query, include_images, include_video, language):
+    """Generate a story, reusing the result for repeated and replayed searches."""
+    return get_agent().tell_story(
+        query,
+        include_images=include_images,
+        include_video=include_video,
+        language=language
+    )
 
+# Initialize session state
 if 'search_history' not in st.session_state:
     st.session_state.search_history = []
 
@@ -99,16 +120,66 @@ if 'current_analysis' not in st.session_state:
     st.session_state.current_analysis = None
 
 # Helper functions
+@st.cache_data(max_entries=64, show_spinner=False)
+def _encode_image_base64(image_path, mtime_ns):
+    """Base64-encode an image; the mtime argument invalidates stale entries."""
+    # Encode in chunks so the raw image is never held in memory whole;
+    # the chunk size is a multiple of 3, so no padding appears mid-stream
+    encoded = bytearray()
+    with open(image_path, "rb") as img_file:
+        while True:
+            chunk = img_file.read(_B64_CHUNK_SIZE)
+            if not chunk:
+                break
+            encoded += _b64.b64encode(chunk)
+    return encoded.decode("ascii")
+
 def get_image_base64(image_path):
     """Convert an image to base64 for embedding in HTML."""
-    with open(image_path, "rb") as img_file:
-        return base64.b64encode(img_file.read()).decode()
+    return _encode_image_base64(image_path, os.stat(image_path).st_mtime_ns)
+
+_ANALYSIS_SECTIONS = (
+    ("historical_context", "Historical Context"),
+    ("linguistic_analysis", "Linguistic Analysis"),
+    ("philosophical_depth", "Philosophical Depth"),
+    ("contemporary_relevance", "Contemporary Relevance"),
+    ("emotional_resonance", "Emotional Resonance"),
+)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _render_analysis_html(analysis):
+    """Render each analysis section as container HTML, once per analysis."""
+    # Blank lines around the escaped text keep it rendered as markdown inside the div
+    return [
+        f'<div class="analysis-container">\n\n'
+        f'{html.escape(analysis.get(key, "Analysis not available."), quote=False)}'
+        f'\n\n</div>'
+        for key, _ in _ANALYSIS_SECTIONS
+    ]
+
+def store_result(result):
+    """Store a tell_story result in session state for display."""
+    st.session_state.current_kural = {
+        "id": result["kural_id"],
+        "tamil": result["kural_text"],
+        "english": result["kural_translation"]
+    }
+
+    st.session_state.current_stories = {
+        "tamil": result.get("tamil_story"),
+        "english": result.get("english_story")
+    }
+
+    st.session_state.current_images = result.get("images", [])
+    st.session_state.current_analysis = result.get("analysis", {})
+    st.session_state.audio = result.get("audio", {})
+    st.session_state.video = result.get("video")
 
 def display_audio_player(audio_path):
     """Display an audio player for the given audio file."""
     if audio_path and os.path.exists(audio_path):
-        audio_bytes = open(audio_path, 'rb').read()
-        st.audio(audio_bytes, format='audio/mp3')
+        # Pass the path so Streamlit serves the file instead of us reading it on every rerun
+        st.audio(audio_path, format='audio/mp3')
     else:
         st.warning("Audio file not available.")
 
@@ -126,38 +197,21 @@ def main():
         include_images = st.checkbox("Generate Images", value=True)
         include_video = st.checkbox("Generate Video", value=False)
 
+        # Map language option to parameter
+        language_param = "both"
+        if language_option == "Tamil Only":
+            language_param = "tamil"
+        elif language_option == "English Only":
+            language_param = "english"
+
         if st.button("Search & Generate"):
             with st.spinner("Searching for relevant Thirukkural..."):
-                # Map language option to parameter
-                language_param = "both"
-                if language_option == "Tamil Only":
-                    language_param = "tamil"
-                elif language_option == "English Only":
-                    language_param = "english"
-
                 # Call the KuralAgent
                 try:
-                    result = st.session_state.kural_agent.tell_story(
-                        search_query,
-                        include_images=include_images,
-                        include_video=include_video,
-                        language=language_param
-                    )
+                    result = _cached_tell_story(search_query, include_images, include_video, language_param)
 
                     # Store the results in session state
-                    st.session_state.current_kural = {
-                        "id": result["kural_id"],
-                        "tamil": result["kural_text"],
-                        "english": result["kural_translation"]
-                    }
-
-                    st.session_state.current_stories = {
-                        "tamil": result.get("tamil_story"),
-                        "english": result.get("english_story")
-                    }
-
-                    st.session_state.current_images = result.get("images", [])
-                    st.session_state.current_analysis = result.get("analysis", {})
+                    store_result(result)
 
                     # Add to search history
                     st.session_state.search_history.append({
@@ -178,27 +232,10 @@ def main():
                     # Regenerate the story for this historical search
                     with st.spinner("Regenerating story..."):
                         try:
-                            result = st.session_state.kural_agent.tell_story(
-                                item['query'],
-                                include_images=include_images,
-                                include_video=include_video,
-                                language=language_param
-                            )
+                            result = _cached_tell_story(item['query'], include_images, include_video, language_param)
 
                             # Update session state
-                            st.session_state.current_kural = {
-                                "id": result["kural_id"],
-                                "tamil": result["kural_text"],
-                                "english": result["kural_translation"]
-                            }
-
-                            st.session_state.current_stories = {
-                                "tamil": result.get("tamil_story"),
-                                "english": result.get("english_story")
-                            }
-
-                            st.session_state.current_images = result.get("images", [])
-                            st.session_state.current_analysis = result.get("analysis", {})
+                            store_result(result)
 
                             st.success("Story regenerated successfully!")
 
@@ -213,14 +250,16 @@ def main():
         kural_col1, kural_col2 = st.columns(2)
 
         with kural_col1:
-            st.markdown('<div class="kural-box">', unsafe_allow_html=True)
-            st.markdown(f'<p class="tamil-text">{st.session_state.current_kural["tamil"]}</p>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="kural-box"><p class="tamil-text">{html.escape(st.session_state.current_kural["tamil"])}</p></div>',
+                unsafe_allow_html=True
+            )
 
         with kural_col2:
-            st.markdown('<div class="kural-box">', unsafe_allow_html=True)
-            st.markdown(f'<p>{st.session_state.current_kural["english"]}</p>', unsafe_allow_html=True)
-            st.markdown('</div>', unsafe_allow_html=True)
+            st.markdown(
+                f'<div class="kural-box"><p>{html.escape(st.session_state.current_kural["english"])}</p></div>',
+                unsafe_allow_html=True
+            )
 
         # Display the stories
         st.markdown('<h2 class="sub-header">Stories</h2>', unsafe_allow_html=True)
@@ -229,9 +268,10 @@ def main():
 
         with story_tabs[0]:
             if st.session_state.current_stories["tamil"]:
-                st.markdown('<div class="story-container">', unsafe_allow_html=True)
-                st.markdown(f'<p class="tamil-text">{st.session_state.current_stories["tamil"]}</p>', unsafe_allow_html=True)
-                st.markdown('</div>', unsafe_allow_html=True)
+                st.markdown(
+                    f'<div class="story-container"><p class="tamil-text">{html.escape(st.session_state.current_stories["tamil"])}</p></div>',
+                    unsafe_allow_html=True
+                )
 
                 # Display Tamil audio if available
                 if "audio" in st.session_state and "tamil" in st.session_state.audio:
@@ -242,9 +282,10 @@ def main():
 
         with story_tabs[1]:
             if st.session_state.current_stories["english"]:
-                st.markdown('<div class="story-container">', unsafe_allow_html=True)
-                st.markdown(f'<p>{st.session_state.current_stories["english"]}</p>', unsafe_allow_html=True)
-                st.markdown('</div>', unsafe_allow_html=True)
+                st.markdown(
+                    f'<div class="story-container"><p>{html.escape(st.session_state.current_stories["english"])}</p></div>',
+                    unsafe_allow_html=True
+                )
 
                 # Display English audio if available
                 if "audio" in st.session_state and "english" in st.session_state.audio:
@@ -257,76 +298,51 @@ def main():
         if st.session_state.current_images:
             st.markdown('<h2 class="sub-header">Generated Images</h2>', unsafe_allow_html=True)
 
-            image_cols = st.columns(min(3, len(st.session_state.current_images)))
-
-            for i, image_data in enumerate(st.session_state.current_images):
-                col_idx = i % len(image_cols)
-                with image_cols[col_idx]:
-                    if image_data.get("file_path") and os.path.exists(image_data["file_path"]):
-                        st.image(image_data["file_path"], caption=f"Image {i+1}", use_column_width=True)
-                        # Show error message if there was an error
-                        if not image_data.get("success", True) and image_data.get("error"):
-                            st.warning(f"Note: {image_data['error']}")
-                    else:
-                        st.warning(f"Image {i+1} not available.")
-                        if image_data.get("error"):
-                            st.error(f"Error: {image_data['error']}")
-
-                        # Show a placeholder message with instructions
-                        st.info("To enable image generation, you need to set up an API key for OpenAI or another provider. Check the documentation for details.")
-
-                        # Show the prompt that would have been used
-                        if image_data.get("prompt"):
-                            with st.expander("Image prompt"):
-                                st.text(image_data["prompt"])
+            # Only send the images to the browser while the user wants them shown
+            if st.checkbox("Show images", value=True, key="show_images"):
+                image_cols = st.columns(min(3, len(st.session_state.current_images)))
+
+                for i, image_data in enumerate(st.session_state.current_images):
+                    col_idx = i % len(image_cols)
+                    with image_cols[col_idx]:
+                        if image_data.get("file_path") and os.path.exists(image_data["file_path"]):
+                            st.image(image_data["file_path"], caption=f"Image {i+1}", use_container_width=True)
+                            # Show error message if there was an error
+                            if not image_data.get("success", True) and image_data.get("error"):
+                                st.warning(f"Note: {image_data['error']}")
+                        else:
+                            st.warning(f"Image {i+1} not available.")
+                            if image_data.get("error"):
+                                st.error(f"Error: {image_data['error']}")
+
+                            # Show a placeholder message with instructions
+                            st.info("To enable image generation, you need to set up an API key for OpenAI or another provider. Check the documentation for details.")
+
+                            # Show the prompt that would have been used
+                            if image_data.get("prompt"):
+                                with st.expander("Image prompt"):
+                                    st.text(image_data["prompt"])
 
         # Display the video if available
         if "video" in st.session_state and st.session_state.video and st.session_state.video.get("file_path"):
             st.markdown('<h2 class="sub-header">Generated Video</h2>', unsafe_allow_html=True)
 
             video_path = st.session_state.video["file_path"]
-            if os.path.exists(video_path):
-                video_bytes = open(video_path, 'rb').read()
-                st.video(video_bytes)
-            else:
+            if not os.path.exists(video_path):
                 st.warning("Video file not available.")
+            elif st.checkbox("Show video", value=True, key="show_video"):
+                st.video(video_path)
 
         # Display the analysis
         if st.session_state.current_analysis:
             st.markdown('<h2 class="sub-header">Literary Analysis</h2>', unsafe_allow_html=True)
 
-            analysis_tabs = st.tabs([
-                "Historical Context",
-                "Linguistic Analysis",
-                "Philosophical Depth",
-                "Contemporary Relevance",
-                "Emotional Resonance"
-            ])
-
-            with analysis_tabs[0]:
-                st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
-                st.markdown(st.session_state.current_analysis.get("historical_context", "Analysis not available."))
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with analysis_tabs[1]:
-                st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
-                st.markdown(st.session_state.current_analysis.get("linguistic_analysis", "Analysis not available."))
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with analysis_tabs[2]:
-                st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
-                st.markdown(st.session_state.current_analysis.get("philosophical_depth", "Analysis not available."))
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with analysis_tabs[3]:
-                st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
-                st.markdown(st.session_state.current_analysis.get("contemporary_relevance", "Analysis not available."))
-                st.markdown('</div>', unsafe_allow_html=True)
-
-            with analysis_tabs[4]:
-                st.markdown('<div class="analysis-container">', unsafe_allow_html=True)
-                st.markdown(st.session_state.current_analysis.get("emotional_resonance", "Analysis not available."))
-                st.markdown('</div>', unsafe_allow_html=True)
+            analysis_tabs = st.tabs([title for _, title in _ANALYSIS_SECTIONS])
+            analysis_html = _render_analysis_html(st.session_state.current_analysis)
+
+            for tab, section_html in zip(analysis_tabs, analysis_html):
+                with tab:
+                    st.markdown(section_html, unsafe_allow_html=True)
 
     else:
         # Display welcome message
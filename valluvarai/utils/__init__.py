@@ -2,4 +2,4 @@
 Utility modules for ValluvarAI.
 """
 
-from valluvarai.utils.cache import cache
+from valluvarai.utils.cache import get_cache
@@ -4,14 +4,143 @@ Provides caching functionality for API responses, generated content, etc.
 """
 
 import os
+import io
+import copy
 import json
+import functools
+import math
 import hashlib
 import time
 import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Union, Tuple
 import pickle
 
+try:
+    # SIMD-accelerated hashing, noticeably faster than hashlib on larger keys
+    from blake3 import blake3 as _key_hash
+except ImportError:
+    _key_hash = None
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False).encode("utf-8")
+    # json.loads accepts bytes as well
+    _loads = json.loads
+
+def _json_round_trips(data: Any) -> bool:
+    """
+    Check whether data comes back from JSON exactly as it went in.
+
+    Only str-keyed dicts, lists, str, int, finite floats, bool and None
+    qualify; tuples, subclasses, numpy values and the like are left to pickle.
+
+    Args:
+        data: Data to check.
+
+    Returns:
+        True if the data can be stored as JSON without changing type.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        value_type = type(value)
+        if value_type is dict:
+            for key in value:
+                if type(key) is not str:
+                    return False
+            stack.extend(value.values())
+        elif value_type is list:
+            stack.extend(value)
+        elif value_type is float:
+            if not math.isfinite(value):
+                return False
+        elif value_type not in (str, int, bool) and value is not None:
+            return False
+
+    return True
+
+# On-disk formats, in lookup order: JSON payloads, raw bytes, framed
+# protocol-5 pickles with out-of-band buffers, plain pickles
+_CACHE_SUFFIXES = (".json", ".bin", ".pk5", ".pkl")
+
+# Pickle buffers at least this large are written out-of-band, without
+# being copied into the pickle stream
+_OOB_MIN_BYTES = 64 * 1024
+
+class _CachePickler(pickle.Pickler):
+    """Pickler that hands large bytes and bytearrays to the buffer callback."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Persistent ids bypass the memo, so repeated objects reuse their id here
+        self._pids = {}
+
+    def persistent_id(self, obj: Any) -> Any:
+        # Pickle only offers PickleBuffer-backed objects (numpy arrays and the
+        # like) out-of-band, so plain byte strings are wrapped here by hand
+        obj_type = type(obj)
+        if (obj_type is bytes or obj_type is bytearray) and len(obj) >= _OOB_MIN_BYTES:
+            entry = self._pids.get(id(obj))
+            if entry is None:
+                entry = self._pids[id(obj)] = (obj, (obj_type.__name__, pickle.PickleBuffer(obj)))
+            return entry[1]
+        return None
+
+class _CacheUnpickler(pickle.Unpickler):
+    """Unpickler for streams written by _CachePickler."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # A repeated persistent id is the same memoized tuple, so map it to one object
+        self._loaded = {}
+
+    def persistent_load(self, pid: Any) -> Any:
+        entry = self._loaded.get(id(pid))
+        if entry is not None:
+            return entry[1]
+
+        type_name, buf = pid
+        if type_name == "bytes":
+            obj = bytes(buf)
+        elif type_name == "bytearray":
+            obj = bytearray(buf)
+        else:
+            raise pickle.UnpicklingError(f"Unknown persistent id: {type_name!r}")
+        self._loaded[id(pid)] = (pid, obj)
+        return obj
+
+# Written to the cache directory once its subdirectories have been created
+_LAYOUT_MARKER = ".valluvarai_cache_v1"
+
+# LRU index of cache entries; the files stay the blob store, sqlite only holds metadata
+_INDEX_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        cache_type TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        suffix TEXT NOT NULL,
+        artifact TEXT,
+        size INTEGER NOT NULL,
+        atime INTEGER NOT NULL,
+        PRIMARY KEY (cache_type, cache_key)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)",
+)
+
+# Bumped whenever the index layout changes; older indexes are rebuilt from disk.
+# Version 1 stores atime as integer nanoseconds; version 2 adds the suffix of
+# the media file linked in by set_artifact (NULL for plain entries).
+_INDEX_VERSION = 2
+
 from valluvarai.config import config
 
 class Cache:
@@ -36,17 +165,28 @@ class Cache:
         else:
             cache_dir_from_config = cache_config.get("cache_dir", "")
             if cache_dir_from_config:
-                self.cache_dir = Path(cache_dir_from_config)
+                self.cache_dir = Path(cache_dir_from_config).expanduser()
             else:
                 # Default to a directory in the user's home directory
                 self.cache_dir = Path.home() / ".valluvarai" / "cache"
 
+        # Paths are immutable and rebuilt on every lookup, so memoize them per instance
+        self._get_cache_path = functools.lru_cache(maxsize=4096)(self._get_cache_path)
+
         self.enable_caching = cache_config.get("enable_caching", True)
         self.max_cache_size_mb = cache_config.get("max_cache_size_mb", 1000)
         self.cache_expiry_days = cache_config.get("cache_expiry_days", 30)
+        self.mem_max_entries = cache_config.get("mem_max_entries", 256)
+
+        # Recently used values, kept decoded so repeat hits skip the disk;
+        # callers get their own copy, so mutating one can't corrupt later hits
+        self._mem: "OrderedDict[Tuple[str, str], Tuple[Any, float]]" = OrderedDict()
+        self._mem_lock = threading.Lock()
 
         # Create cache directory if it doesn't exist
-        if self.enable_caching:
+        # The marker is written once the layout exists, so later starts need a single stat
+        marker = self.cache_dir / _LAYOUT_MARKER
+        if self.enable_caching and not marker.exists():
             self.cache_dir.mkdir(parents=True, exist_ok=True)
 
             # Create subdirectories for different types of cached content
@@ -56,6 +196,160 @@ class Cache:
             (self.cache_dir / "audio").mkdir(exist_ok=True)
             (self.cache_dir / "analysis").mkdir(exist_ok=True)
 
+            marker.touch()
+
+        # Index of entry sizes and access times, used for sizing and LRU eviction
+        self._db_lock = threading.Lock()
+        self._db = self._open_index() if self.enable_caching else None
+
+    def _open_index(self) -> sqlite3.Connection:
+        """
+        Open the sqlite index of cache entries, building it from disk on first use.
+
+        Returns:
+            Connection to the index database.
+        """
+        db_path = self.cache_dir / "index.db"
+
+        db = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+
+        if db.execute("PRAGMA user_version").fetchone()[0] != _INDEX_VERSION:
+            # New or outdated index: (re)build it from the entries on disk
+            db.execute("BEGIN")
+            db.execute("DROP TABLE IF EXISTS entries")
+            for statement in _INDEX_SCHEMA:
+                db.execute(statement)
+            db.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                self._scan_entries()
+            )
+            db.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+            db.execute("COMMIT")
+
+        # Running total of the cache size, so writes don't have to query the index
+        self._current_size_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+        return db
+
+    def _scan_entries(self) -> List[Tuple[str, str, str, Optional[str], int, int]]:
+        """
+        Walk the cache directory for stored entries.
+
+        Returns:
+            List of (cache type, cache key, suffix, artifact suffix, size,
+            mtime in nanoseconds) tuples.
+        """
+        # One scandir per cache type; DirEntry caches its stat, so each file costs one call
+        entries = []
+        with os.scandir(self.cache_dir) as type_dirs:
+            for type_dir in type_dirs:
+                if not type_dir.is_dir(follow_symlinks=False):
+                    continue
+
+                # Group the files of each key: an entry file, plus the linked
+                # media file when the entry is an artifact manifest
+                files_by_key = {}
+                with os.scandir(type_dir.path) as files:
+                    for entry in files:
+                        if not entry.is_file(follow_symlinks=False) or entry.name.endswith(".tmp"):
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        files_by_key.setdefault(entry.name.partition(".")[0], []).append(
+                            (entry.path, os.path.splitext(entry.name)[1], stat.st_size, stat.st_mtime_ns)
+                        )
+
+                for cache_key, key_files in files_by_key.items():
+                    suffixes = [suffix for _, suffix, _, _ in key_files]
+                    suffix = next((s for s in _CACHE_SUFFIXES if s in suffixes), None)
+                    if suffix is None:
+                        # Media whose manifest is gone can never be looked up again
+                        for path, _, _, _ in key_files:
+                            try:
+                                os.unlink(path)
+                            except OSError:
+                                pass
+                        continue
+
+                    entry_file = key_files[suffixes.index(suffix)]
+                    media = [f for f in key_files if f is not entry_file] if suffix == ".json" else []
+                    artifact = media[0][1] if media else None
+                    size = entry_file[2] + sum(f[2] for f in media)
+                    entries.append((type_dir.name, cache_key, suffix, artifact, size, entry_file[3]))
+
+        return entries
+
+    def _index_row(self, cache_type: str, cache_key: str) -> Optional[Tuple[str, Optional[str], int]]:
+        """
+        Look up an entry in the index.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+
+        Returns:
+            Tuple of (suffix, artifact suffix, size), or None if not indexed.
+        """
+        with self._db_lock:
+            return self._db.execute(
+                "SELECT suffix, artifact, size FROM entries WHERE cache_type = ? AND cache_key = ?",
+                (cache_type, cache_key)
+            ).fetchone()
+
+    def _index_put(self, cache_type: str, cache_key: str, suffix: str, artifact: Optional[str], size: int):
+        """
+        Record an entry in the index and the running size total.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+            suffix: Suffix of the entry file.
+            artifact: Suffix of the linked media file, or None.
+            size: Total size of the entry's files in bytes.
+        """
+        with self._db_lock:
+            old = self._db.execute(
+                "SELECT size FROM entries WHERE cache_type = ? AND cache_key = ?",
+                (cache_type, cache_key)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_type, cache_key, suffix, artifact, size, time.time_ns())
+            )
+            self._current_size_bytes += size - (old[0] if old else 0)
+
+    def _index_drop(self, cache_type: str, cache_key: str):
+        """
+        Remove an entry from the index and the running size total.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+        """
+        with self._db_lock:
+            old = self._db.execute(
+                "SELECT size FROM entries WHERE cache_type = ? AND cache_key = ?",
+                (cache_type, cache_key)
+            ).fetchone()
+            if old:
+                self._db.execute(
+                    "DELETE FROM entries WHERE cache_type = ? AND cache_key = ?",
+                    (cache_type, cache_key)
+                )
+                self._current_size_bytes -= old[0]
+
+    def _index_execute(self, sql: str, params: Tuple = ()):
+        """
+        Run a single statement against the index.
+
+        Args:
+            sql: SQL statement.
+            params: Statement parameters.
+        """
+        with self._db_lock:
+            self._db.execute(sql, params)
+
     def _get_cache_key(self, key_data: Any) -> str:
         """
         Generate a cache key from the input data.
@@ -66,29 +360,220 @@ class Cache:
         Returns:
             Cache key as a string.
         """
-        # Convert the input data to a string
-        if isinstance(key_data, dict):
-            key_str = json.dumps(key_data, sort_keys=True)
-        elif isinstance(key_data, (list, tuple)):
+        # Convert the input data to a string; the C JSON encoder gives a canonical key order
+        if isinstance(key_data, (dict, list, tuple)):
             key_str = json.dumps(key_data, sort_keys=True)
         else:
             key_str = str(key_data)
 
-        # Generate a hash of the string
-        return hashlib.md5(key_str.encode()).hexdigest()
+        # Generate a 32-character hash of the string
+        key_bytes = key_str.encode()
+        if _key_hash is not None:
+            return _key_hash(key_bytes).hexdigest(16)
+        return hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
 
-    def _get_cache_path(self, cache_type: str, cache_key: str) -> Path:
+    def _get_cache_path(self, cache_type: str, cache_key: str, suffix: str = ".json") -> Path:
         """
         Get the path to a cache file.
 
         Args:
             cache_type: Type of cached content (kural, stories, images, etc.).
             cache_key: Cache key.
+            suffix: File format suffix (.json, .bin or .pkl).
 
         Returns:
             Path to the cache file.
         """
-        return self.cache_dir / cache_type / f"{cache_key}.pkl"
+        return self.cache_dir / cache_type / f"{cache_key}{suffix}"
+
+    def _find_cache_file(self, cache_type: str, cache_key: str) -> Tuple[Optional[Path], Optional[os.stat_result]]:
+        """
+        Find the stored file for a cache key, whatever format it was written in.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+
+        Returns:
+            Tuple of (path, stat result), or (None, None) if nothing is cached.
+        """
+        for suffix in _CACHE_SUFFIXES:
+            cache_path = self._get_cache_path(cache_type, cache_key, suffix)
+            try:
+                return cache_path, cache_path.stat()
+            except FileNotFoundError:
+                continue
+        return None, None
+
+    def _existing_files(self, cache_type: str, cache_key: str) -> List[Tuple[Path, int]]:
+        """
+        List the stored files for a cache key in every format.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+
+        Returns:
+            List of (path, size in bytes) tuples.
+        """
+        files = []
+        for suffix in _CACHE_SUFFIXES:
+            cache_path = self._get_cache_path(cache_type, cache_key, suffix)
+            try:
+                files.append((cache_path, cache_path.stat().st_size))
+            except FileNotFoundError:
+                continue
+        return files
+
+    def _encode(self, data: Any) -> Tuple[str, List[Any]]:
+        """
+        Serialize data for the cache.
+
+        Bytes are stored raw, data that survives a JSON round-trip unchanged
+        as JSON, and anything else falls back to pickle. Large buffers exposed
+        to pickle (numpy arrays and the like) are framed after the pickle
+        stream rather than copied into it.
+
+        Args:
+            data: Data to serialize.
+
+        Returns:
+            Tuple of (file suffix, list of bytes-like chunks to write in order).
+        """
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return ".bin", [data]
+        if _json_round_trips(data):
+            try:
+                return ".json", [_dumps(data)]
+            except (TypeError, ValueError):
+                # Integers beyond 64 bits under orjson, lone surrogates, ...
+                pass
+
+        # Returning a true value keeps a small buffer in-band
+        buffers = []
+        stream = io.BytesIO()
+        _CachePickler(
+            stream,
+            protocol=5,
+            buffer_callback=lambda buf: buf.raw().nbytes < _OOB_MIN_BYTES or buffers.append(buf)
+        ).dump(data)
+        pickled = stream.getvalue()
+        if not buffers:
+            return ".pkl", [pickled]
+
+        # Each part is preceded by its 8-byte little-endian length
+        chunks = [len(pickled).to_bytes(8, "little"), pickled]
+        for buf in buffers:
+            raw = buf.raw()
+            chunks += [raw.nbytes.to_bytes(8, "little"), raw]
+        return ".pk5", chunks
+
+    def _decode_framed(self, payload: bytearray) -> Any:
+        """
+        Load a framed protocol-5 pickle written by _encode.
+
+        Args:
+            payload: Contents of the cache file.
+
+        Returns:
+            The unpickled data, with its out-of-band buffers backed by payload.
+        """
+        view = memoryview(payload)
+        size = int.from_bytes(view[:8], "little")
+        pickled = view[8:8 + size]
+        pos = 8 + size
+
+        buffers = []
+        while pos < len(view):
+            size = int.from_bytes(view[pos:pos + 8], "little")
+            buffers.append(view[pos + 8:pos + 8 + size])
+            pos += 8 + size
+
+        return _CacheUnpickler(io.BytesIO(pickled), buffers=buffers).load()
+
+    def _write_atomic(self, cache_path: Path, *chunks: Any):
+        """
+        Write a cache file through a temporary file so readers never see a partial write.
+
+        Args:
+            cache_path: Final path of the cache file.
+            *chunks: Bytes-like objects to write, in order.
+        """
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            f = open(tmp_path, 'wb')
+        except FileNotFoundError:
+            # Cache types without a subdirectory created in __init__
+            tmp_path.parent.mkdir(parents=True, exist_ok=True)
+            f = open(tmp_path, 'wb')
+        try:
+            with f:
+                f.writelines(chunks)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _mem_get(self, cache_type: str, cache_key: str) -> Optional[Any]:
+        """
+        Look up a value in the in-memory layer.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+
+        Returns:
+            A copy of the cached value if present and not expired, None otherwise.
+        """
+        with self._mem_lock:
+            entry = self._mem.get((cache_type, cache_key))
+            if entry is None:
+                return None
+
+            data, written = entry
+            if (time.time() - written) / (60 * 60 * 24) > self.cache_expiry_days:
+                del self._mem[(cache_type, cache_key)]
+                return None
+
+            self._mem.move_to_end((cache_type, cache_key))
+        return copy.deepcopy(data)
+
+    def _mem_put(self, cache_type: str, cache_key: str, data: Any, written: float):
+        """
+        Add a value to the in-memory layer, dropping the least recently used if full.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+            data: Value to keep; a copy is stored, so the caller keeps ownership.
+            written: Time the value was written to disk.
+        """
+        if self.mem_max_entries <= 0:
+            return
+
+        data = copy.deepcopy(data)
+        with self._mem_lock:
+            self._mem[(cache_type, cache_key)] = (data, written)
+            self._mem.move_to_end((cache_type, cache_key))
+            while len(self._mem) > self.mem_max_entries:
+                self._mem.popitem(last=False)
+
+    def _mem_discard(self, cache_type: Optional[str] = None, cache_key: Optional[str] = None):
+        """
+        Remove values from the in-memory layer.
+
+        Args:
+            cache_type: Type to remove. If None, removes everything.
+            cache_key: Key to remove. If None, removes the whole type.
+        """
+        with self._mem_lock:
+            if cache_type is None:
+                self._mem.clear()
+            elif cache_key is not None:
+                self._mem.pop((cache_type, cache_key), None)
+            else:
+                for mem_key in [k for k in self._mem if k[0] == cache_type]:
+                    del self._mem[mem_key]
 
     def get(self, cache_type: str, key_data: Any) -> Optional[Any]:
         """
@@ -105,22 +590,47 @@ class Cache:
             return None
 
         cache_key = self._get_cache_key(key_data)
-        cache_path = self._get_cache_path(cache_type, cache_key)
 
-        if not cache_path.exists():
+        data = self._mem_get(cache_type, cache_key)
+        if data is not None:
+            return data
+
+        cache_path, stat = self._find_cache_file(cache_type, cache_key)
+
+        if cache_path is None:
             return None
 
         # Check if the cache is expired
-        cache_age_days = (time.time() - cache_path.stat().st_mtime) / (60 * 60 * 24)
+        cache_age_days = (time.time() - stat.st_mtime) / (60 * 60 * 24)
         if cache_age_days > self.cache_expiry_days:
             # Remove expired cache
-            cache_path.unlink()
+            row = self._index_row(cache_type, cache_key)
+            self._remove_entry(cache_type, cache_key, cache_path.suffix, row[1] if row else None)
             return None
 
         # Load the cached data
         try:
-            with open(cache_path, 'rb') as f:
-                return pickle.load(f)
+            self._index_execute(
+                "UPDATE entries SET atime = ? WHERE cache_type = ? AND cache_key = ?",
+                (time.time_ns(), cache_type, cache_key)
+            )
+            if cache_path.suffix == ".pk5":
+                # Read into a writable buffer so arrays loaded from it stay writable
+                payload = bytearray(stat.st_size)
+                with open(cache_path, 'rb') as f:
+                    f.readinto(payload)
+                data = self._decode_framed(payload)
+            else:
+                payload = cache_path.read_bytes()
+                if cache_path.suffix == ".json":
+                    data = _loads(payload)
+                elif cache_path.suffix == ".bin":
+                    data = payload
+                else:
+                    data = pickle.loads(payload)
+
+            self._mem_put(cache_type, cache_key, data, stat.st_mtime)
+            return data
         except Exception as e:
             print(f"Error loading cache: {e}")
             return None
@@ -144,17 +654,187 @@ class Cache:
         self._cleanup_cache_if_needed()
 
         cache_key = self._get_cache_key(key_data)
-        cache_path = self._get_cache_path(cache_type, cache_key)
 
         # Save the data to cache
         try:
-            with open(cache_path, 'wb') as f:
-                pickle.dump(data, f)
+            suffix, chunks = self._encode(data)
+            cache_path = self._get_cache_path(cache_type, cache_key, suffix)
+            old_files = self._existing_files(cache_type, cache_key)
+            old_row = self._index_row(cache_type, cache_key)
+            self._write_atomic(cache_path, *chunks)
+
+            # Drop copies in other formats so they can't shadow this entry,
+            # and media linked in by an earlier set_artifact
+            for old_path, _ in old_files:
+                if old_path != cache_path:
+                    old_path.unlink(missing_ok=True)
+            if old_row and old_row[1]:
+                self._get_cache_path(cache_type, cache_key, old_row[1]).unlink(missing_ok=True)
+
+            self._index_put(cache_type, cache_key, suffix, None, sum(memoryview(c).nbytes for c in chunks))
+            self._mem_put(cache_type, cache_key, data, time.time())
             return True
         except Exception as e:
+            self._mem_discard(cache_type, cache_key)
             print(f"Error caching data: {e}")
             return False
 
+    def set_artifact(
+        self,
+        cache_type: str,
+        key_data: Any,
+        file_path: str,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """
+        Cache a generated media file by linking it into the cache.
+
+        The file is hard-linked rather than copied (copied only when the cache
+        is on another filesystem), and its metadata is written to a small JSON
+        manifest alongside it.
+
+        Args:
+            cache_type: Type of cached content (images, audio, etc.).
+            key_data: Data to generate the cache key from.
+            file_path: Path to the generated file.
+            meta: Metadata to store with the file.
+
+        Returns:
+            Path to the cached file if it was cached successfully, None otherwise.
+        """
+        if not self.enable_caching:
+            return None
+
+        # Check if we need to clean up the cache
+        self._cleanup_cache_if_needed()
+
+        cache_key = self._get_cache_key(key_data)
+        suffix = Path(file_path).suffix or ".bin"
+        artifact_path = self._get_cache_path(cache_type, cache_key, suffix)
+        manifest_path = self._get_cache_path(cache_type, cache_key, ".json")
+
+        try:
+            tmp_path = artifact_path.with_name(f"{artifact_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                self._link_or_copy(file_path, tmp_path)
+            except FileNotFoundError:
+                # The cache type's directory doesn't exist yet
+                artifact_path.parent.mkdir(parents=True, exist_ok=True)
+                self._link_or_copy(file_path, tmp_path)
+            os.replace(tmp_path, artifact_path)
+            artifact_size = artifact_path.stat().st_size
+
+            payload = _dumps({
+                "artifact": artifact_path.name,
+                "suffix": suffix,
+                "size": artifact_size,
+                "meta": meta or {}
+            })
+            self._write_atomic(manifest_path, payload)
+
+            # Drop whatever was stored under this key in another form
+            old_row = self._index_row(cache_type, cache_key)
+            if old_row:
+                for old_suffix in old_row[:2]:
+                    if old_suffix and old_suffix not in (suffix, ".json"):
+                        self._get_cache_path(cache_type, cache_key, old_suffix).unlink(missing_ok=True)
+
+            self._index_put(cache_type, cache_key, ".json", suffix, artifact_size + len(payload))
+            return str(artifact_path)
+        except Exception as e:
+            print(f"Error caching artifact: {e}")
+            return None
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: Path):
+        """
+        Hard-link a file, copying it when linking isn't possible.
+
+        Args:
+            src: Path to the source file.
+            dst: Path to create.
+        """
+        try:
+            os.link(src, dst)
+        except FileNotFoundError:
+            raise
+        except OSError:
+            # Cross-device or no hardlink support
+            shutil.copyfile(src, dst)
+
+    def get_artifact(self, cache_type: str, key_data: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Get a cached media file without reading its contents.
+
+        Args:
+            cache_type: Type of cached content (images, audio, etc.).
+            key_data: Data to generate the cache key from.
+
+        Returns:
+            Tuple of (path to the cached file, metadata) if available and not
+            expired, None otherwise.
+        """
+        if not self.enable_caching:
+            return None
+
+        cache_key = self._get_cache_key(key_data)
+        manifest_path = self._get_cache_path(cache_type, cache_key, ".json")
+
+        try:
+            stat = manifest_path.stat()
+        except FileNotFoundError:
+            return None
+
+        try:
+            manifest = _loads(manifest_path.read_bytes())
+            artifact_path = manifest_path.with_name(manifest["artifact"])
+
+            # Check if the cache is expired or the file has gone missing
+            cache_age_days = (time.time() - stat.st_mtime) / (60 * 60 * 24)
+            if cache_age_days > self.cache_expiry_days or not artifact_path.exists():
+                self._remove_entry(cache_type, cache_key, ".json", artifact_path.suffix)
+                return None
+
+            self._index_execute(
+                "UPDATE entries SET atime = ? WHERE cache_type = ? AND cache_key = ?",
+                (time.time_ns(), cache_type, cache_key)
+            )
+            return str(artifact_path), manifest["meta"]
+        except Exception as e:
+            print(f"Error loading cached artifact: {e}")
+            return None
+
+    def _remove_entry(self, cache_type: str, cache_key: str, suffix: str, artifact: Optional[str]):
+        """
+        Remove an entry's files and its index row.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+            suffix: Suffix of the entry file.
+            artifact: Suffix of the media file linked to a manifest entry, or None.
+        """
+        self._mem_discard(cache_type, cache_key)
+        self._unlink_entry_files(cache_type, cache_key, suffix, artifact)
+        self._index_drop(cache_type, cache_key)
+
+    def _unlink_entry_files(self, cache_type: str, cache_key: str, suffix: str, artifact: Optional[str]):
+        """
+        Delete an entry's files, carrying on past any that can't be removed.
+
+        Args:
+            cache_type: Type of cached content (kural, stories, images, etc.).
+            cache_key: Cache key.
+            suffix: Suffix of the entry file.
+            artifact: Suffix of the media file linked to a manifest entry, or None.
+        """
+        for file_suffix in (suffix, artifact):
+            if file_suffix:
+                try:
+                    os.unlink(self._get_cache_path(cache_type, cache_key, file_suffix))
+                except OSError:
+                    pass
+
     def invalidate(self, cache_type: str, key_data: Any) -> bool:
         """
         Invalidate cached data.
@@ -170,14 +850,18 @@ class Cache:
             return False
 
         cache_key = self._get_cache_key(key_data)
-        cache_path = self._get_cache_path(cache_type, cache_key)
-
-        if not cache_path.exists():
-            return False
+        cache_files = self._existing_files(cache_type, cache_key)
+        self._mem_discard(cache_type, cache_key)
 
         try:
-            cache_path.unlink()
-            return True
+            row = self._index_row(cache_type, cache_key)
+
+            for cache_path, _ in cache_files:
+                cache_path.unlink()
+            # Media linked in by set_artifact
+            if row:
+                self._remove_entry(cache_type, cache_key, row[0], row[1])
+            return bool(cache_files or row)
         except Exception as e:
             print(f"Error invalidating cache: {e}")
             return False
@@ -195,21 +879,31 @@ class Cache:
         if not self.enable_caching:
             return False
 
+        self._mem_discard(cache_type or None)
+
         try:
             if cache_type:
                 # Clear specific cache type
-                cache_dir = self.cache_dir / cache_type
-                if cache_dir.exists():
-                    for file in cache_dir.glob("*.pkl"):
-                        file.unlink()
+                cache_dirs = [self.cache_dir / cache_type]
             else:
-                # Clear all cache
-                for cache_dir in ["kural", "stories", "images", "audio", "analysis"]:
-                    cache_path = self.cache_dir / cache_dir
-                    if cache_path.exists():
-                        for file in cache_path.glob("*.pkl"):
+                # Clear all cache, including types created on first write
+                cache_dirs = [path for path in self.cache_dir.iterdir() if path.is_dir()]
+
+            for cache_dir in cache_dirs:
+                if cache_dir.exists():
+                    for file in cache_dir.iterdir():
+                        if file.is_file():
                             file.unlink()
 
+            with self._db_lock:
+                if cache_type:
+                    self._db.execute("DELETE FROM entries WHERE cache_type = ?", (cache_type,))
+                else:
+                    self._db.execute("DELETE FROM entries")
+                self._current_size_bytes = self._db.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()[0]
+
             return True
         except Exception as e:
             print(f"Error clearing cache: {e}")
@@ -222,39 +916,61 @@ class Cache:
         Returns:
             Total size of the cache in bytes.
         """
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(self.cache_dir):
-            for filename in filenames:
-                file_path = Path(dirpath) / filename
-                total_size += file_path.stat().st_size
-
-        return total_size
+        return self._current_size_bytes
 
     def _cleanup_cache_if_needed(self):
         """Clean up the cache if it exceeds the maximum size."""
         # Check if the cache size exceeds the maximum
-        cache_size_mb = self._get_cache_size() / (1024 * 1024)
-        if cache_size_mb <= self.max_cache_size_mb:
+        max_bytes = self.max_cache_size_mb * 1024 * 1024
+        if self._current_size_bytes <= max_bytes:
             return
 
-        # Get all cache files with their modification times
-        cache_files = []
-        for dirpath, dirnames, filenames in os.walk(self.cache_dir):
-            for filename in filenames:
-                file_path = Path(dirpath) / filename
-                cache_files.append((file_path, file_path.stat().st_mtime))
-
-        # Sort by modification time (oldest first)
-        cache_files.sort(key=lambda x: x[1])
-
-        # Remove files until the cache size is below the maximum
-        for file_path, _ in cache_files:
-            file_path.unlink()
-
-            # Check if we've freed up enough space
-            cache_size_mb = self._get_cache_size() / (1024 * 1024)
-            if cache_size_mb <= self.max_cache_size_mb * 0.8:  # Aim for 80% of max size
-                break
-
-# Global cache instance
-cache = Cache()
+        with self._db_lock:
+            # Other processes share the index, so resync the total before evicting
+            cache_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            self._current_size_bytes = cache_size
+            if cache_size <= max_bytes:
+                return
+
+            # Collect least recently used entries until we're under 80% of max size
+            evicted = []
+            rows = self._db.execute(
+                "SELECT cache_type, cache_key, suffix, artifact, size FROM entries ORDER BY atime"
+            )
+            for cache_type, cache_key, suffix, artifact, size in rows:
+                if cache_size <= max_bytes * 0.8:
+                    break
+                evicted.append((cache_type, cache_key, suffix, artifact))
+                cache_size -= size
+            rows.close()
+
+            # Drop their rows in a single transaction
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "DELETE FROM entries WHERE cache_type = ? AND cache_key = ?",
+                [(cache_type, cache_key) for cache_type, cache_key, _, _ in evicted]
+            )
+            self._db.execute("COMMIT")
+            self._current_size_bytes = cache_size
+
+        # Their rows are already gone, so one failed unlink mustn't stop the rest
+        for cache_type, cache_key, suffix, artifact in evicted:
+            self._mem_discard(cache_type, cache_key)
+            self._unlink_entry_files(cache_type, cache_key, suffix, artifact)
+
+@functools.lru_cache(maxsize=1)
+def get_cache() -> Cache:
+    """
+    Get the global cache instance, creating it on first use.
+
+    Returns:
+        The shared Cache instance.
+    """
+    return Cache()
+
+def __getattr__(name: str) -> Any:
+    # Keep `from valluvarai.utils.cache import cache` working without
+    # building the global instance at import time
+    if name == "cache":
+        return get_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")